@@ -1,49 +1,469 @@
-from flask import Flask, jsonify, request, abort
+from flask import Flask, Response, g, jsonify, request, abort, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from library_manager import LibraryManager
+from library_manager import LibraryManager, MEDIA_FIELDS
+from response_cache import CachedResponse, ResponseCache
+from event_broker import OVERFLOW, EventBroker
+import metrics
+import profiling
+import serializers
+import atexit
+import functools
 import json
+import os
+import time
+from urllib.parse import urlencode
+from datetime import datetime
+
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify et request.json passent par `serializers` (orjson: JSON compact en UTF-8, clés non triées)."""
+
+    def dumps(self, obj, **kwargs):
+        return serializers.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return serializers.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(serializers.dumps(obj) + b'\n', mimetype=self.mimetype)
+
 
 app = Flask(__name__)
+# Encodeur rapide s'il est disponible; sinon le fournisseur JSON par défaut de Flask
+if serializers.ENCODER != 'json':
+    app.json = FastJSONProvider(app)
 # Permet les requêtes de tous les clients (important pour le frontend local)
-CORS(app) 
+CORS(app, expose_headers=['X-Next-Cursor', 'ETag', 'X-Profile-Id'])
 manager = LibraryManager()
+# Vide le journal / les écritures en attente à l'arrêt du serveur
+atexit.register(manager.close)
+# Cache des réponses de lecture, invalidé à chaque changement de version des données
+response_cache = ResponseCache(max_bytes=int(os.environ.get('LIBRARY_RESPONSE_CACHE_BYTES', 32 * 1024 * 1024)))
+# Diffusion des ajouts/suppressions aux clients abonnés à GET /media/events
+event_broker = EventBroker(queue_size=int(os.environ.get('LIBRARY_EVENT_QUEUE_SIZE', 1000)))
+manager.add_listener(event_broker.publish)
+
+
+# --- Métriques par route (désactivées avec LIBRARY_METRICS=0: aucun hook n'est alors installé) ---
+REQUESTS_TOTAL = metrics.REGISTRY.counter(
+    'http_requests_total', "HTTP requests by route, method and status.", ('method', 'route', 'status'))
+REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    'http_request_duration_seconds', "Time to produce the response (streamed bodies excluded).", ('method', 'route'))
+RESPONSE_BYTES = metrics.REGISTRY.histogram(
+    'http_response_size_bytes', "Response body size, when known in advance.", ('method', 'route'),
+    buckets=metrics.SIZE_BUCKETS)
+metrics.REGISTRY.gauge('library_media_count', "Media in the catalog (absent while loading).",
+                       lambda: sum(manager.get_category_counts().values()) if manager.is_loaded else None)
+metrics.REGISTRY.counter_callback('library_response_cache_hits_total', "Read responses served from the cache.",
+                                  lambda: response_cache.stats()['hits'])
+metrics.REGISTRY.counter_callback('library_response_cache_misses_total', "Read responses computed by the handler.",
+                                  lambda: response_cache.stats()['misses'])
+metrics.REGISTRY.gauge('library_event_subscribers', "Clients connected to /media/events.",
+                       lambda: event_broker.stats()['subscribers'])
+
+
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+def _record_request_metrics(response):
+    """Compte la requête et observe sa durée et la taille de sa réponse, par route (et non par URL)."""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, route)
+        REQUESTS_TOTAL.inc(request.method, route, str(response.status_code))
+        if response.content_length is not None:
+            RESPONSE_BYTES.observe(response.content_length, request.method, route)
+    return response
+
+
+if metrics.ENABLED:
+    app.before_request(_start_request_timer)
+    app.after_request(_record_request_metrics)
+
+
+# --- Profilage à la demande (actif seulement si LIBRARY_PROFILING_TOKEN est défini) ---
+# Une requête portant le jeton (en-tête ou paramètre) est profilée; l'ID du profil est renvoyé dans X-Profile-Id
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_QUERY_ARG = '_profile'
+profile_store = profiling.ProfileStore()
+
+
+def _start_profiling():
+    token = request.headers.get(PROFILE_HEADER, request.args.get(PROFILE_QUERY_ARG))
+    if token is None or request.path.startswith('/admin/profiles'):
+        return
+    if not profiling.token_matches(token):
+        abort(403, description="Invalid profiling token.")
+    g.profile = profiling.start()
+
+
+def _finish_profiling(response):
+    """Arrête le profileur de la requête et range le profil (le jeton n'est pas conservé dans le chemin)."""
+    started = g.pop('profile', None)
+    if started is None:
+        return response
+    profiler, start_time = started
+    profiler.disable()
+    query = urlencode([(name, value) for name, value in request.args.items(multi=True) if name != PROFILE_QUERY_ARG])
+    profile_id = profile_store.add(request.method, request.path + ('?' + query if query else ''),
+                                   response.status_code, time.perf_counter() - start_time, profiler)
+    response.headers['X-Profile-Id'] = str(profile_id)
+    return response
+
+
+if profiling.ENABLED:
+    app.before_request(_start_profiling)
+    app.after_request(_finish_profiling)
+
+
+def cached_read(view):
+    """
+    Met en cache le corps sérialisé des réponses 200 d'une route de lecture,
+    par (route, arguments, version des données), et gère If-None-Match -> 304.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not manager.is_loaded:
+            # Chargement en arrière-plan: les lectures par ID sont servies sans attendre ni cacher
+            return view(*args, **kwargs)
+        version = manager.data_version
+        key = (request.path, tuple(sorted(request.args.items(multi=True))))
+        entry = response_cache.get(key, version)
+        if entry is None:
+            response = view(*args, **kwargs)
+            # Une mutation pendant le calcul: la réponse est servie mais pas mise en cache
+            if response.status_code != 200 or manager.data_version != version:
+                return response
+            headers = {name: value for name, value in response.headers.items() if name == 'X-Next-Cursor'}
+            entry = CachedResponse(response.get_data(), response.mimetype, headers)
+            response_cache.put(key, version, entry)
+
+        if request.if_none_match.contains(entry.etag):
+            response = Response(status=304)
+        else:
+            response = Response(entry.body, mimetype=entry.mimetype, headers=entry.headers)
+        response.set_etag(entry.etag)
+        return response
+    return wrapper
+
+
+# --- Pagination et projection des listes ---
+# Taille maximale d'une page (?limit=)
+MAX_PAGE_SIZE = 1000
+# Champs sélectionnables avec ?fields= (l'ID est toujours renvoyé)
+PROJECTABLE_FIELDS = MEDIA_FIELDS + ("score",)
+
+
+def _limit_arg(default, maximum):
+    """Lit ?limit= (entier positif), plafonné à `maximum`."""
+    raw_limit = request.args.get('limit')
+    if raw_limit is None:
+        return default
+    try:
+        limit = int(raw_limit)
+    except ValueError:
+        limit = 0
+    if limit <= 0:
+        abort(400, description="Query parameter 'limit' must be a positive integer.")
+    return min(limit, maximum)
+
+
+def _offset_cursor_arg():
+    """Lit ?cursor= pour les résultats classés (recherche): c'est une position dans le classement."""
+    raw_cursor = request.args.get('cursor', '0')
+    if not raw_cursor.isdigit():
+        abort(400, description="Query parameter 'cursor' is invalid for ranked results.")
+    return int(raw_cursor)
+
+
+def _fields_arg():
+    """Lit ?fields=name,author. Retourne None si aucune projection n'est demandée."""
+    raw_fields = request.args.get('fields')
+    if raw_fields is None:
+        return None
+    fields = [field.strip() for field in raw_fields.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in PROJECTABLE_FIELDS and field != 'id']
+    if unknown:
+        abort(400, description=f"Unknown fields: {unknown}. Must be among {list(PROJECTABLE_FIELDS)}")
+    return fields
+
+
+def _project(media, fields):
+    """Ne garde que l'ID et les champs demandés."""
+    if fields is None:
+        return media
+    return {"id": media["id"], **{field: media[field] for field in fields if field in media}}
+
+
+@metrics.timed(metrics.SERIALIZATION_SECONDS, 'json_response')
+def _list_response(media_list, fields, next_cursor=None, encoded=False):
+    """
+    Réponse JSON d'une liste; le curseur de la page suivante est dans l'en-tête X-Next-Cursor.
+    Avec `encoded`, les médias sont déjà encodés (bytes, sans projection): ils sont simplement concaténés.
+    """
+    if encoded:
+        response = Response(serializers.join_array(media_list) + b'\n', mimetype='application/json')
+    else:
+        response = jsonify([_project(media, fields) for media in media_list])
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return response
+
+
+def _ranked_page(search, limit):
+    """Pagine des résultats classés: demande une entrée de plus pour savoir s'il reste une page."""
+    offset = _offset_cursor_arg()
+    results = search(limit + 1, offset)
+    next_cursor = offset + limit if len(results) > limit else None
+    return results[:limit], next_cursor
+
 
 # --- Endpoint 1 & 2: Lister tous les médias ou par catégorie ---
+def _check_category(category):
+    """400 Bad Request si la catégorie n'est pas supportée."""
+    if category not in manager.categories_allowed:
+        abort(400, description=f"Invalid category: {category}. Must be one of {manager.categories_allowed}")
+
+
+def _media_list_response(category=None):
+    """
+    Liste les médias (d'une catégorie). Avec ?published_from= et/ou ?published_to=, renvoie
+    les médias publiés dans l'intervalle, triés par date; avec ?limit= et/ou ?cursor=, une page.
+    """
+    fields = _fields_arg()
+    # Sans projection, les médias arrivent déjà encodés (cache d'encodage du Manager)
+    encoded = fields is None
+    paginated = 'limit' in request.args or 'cursor' in request.args
+    limit = _limit_arg(MAX_PAGE_SIZE, MAX_PAGE_SIZE) if paginated else None
+    if 'published_from' in request.args or 'published_to' in request.args:
+        try:
+            media_list, next_cursor = manager.list_media_by_publication_date(
+                request.args.get('published_from'), request.args.get('published_to'),
+                category=category, limit=limit, cursor=request.args.get('cursor'), encoded=encoded
+            )
+        except ValueError as e:
+            abort(400, description=str(e))
+        return _list_response(media_list, fields, next_cursor, encoded)
+    if paginated:
+        media_list, next_cursor = manager.list_media(category=category, limit=limit, cursor=request.args.get('cursor'),
+                                                     encoded=encoded)
+        return _list_response(media_list, fields, next_cursor, encoded)
+    if category is not None:
+        return _list_response(manager.get_media_by_category(category, encoded=encoded), fields, encoded=encoded)
+    return _list_response(manager.get_all_media(encoded=encoded), fields, encoded=encoded)
+
+
 @app.route('/media', methods=['GET'])
+@cached_read
 def get_all_media():
-    """Retourne tous les médias."""
-    return jsonify(manager.get_all_media())
+    """Retourne tous les médias (filtre optionnel ?category=). Voir _media_list_response."""
+    category = request.args.get('category')
+    if category is not None:
+        _check_category(category)
+    return _media_list_response(category)
 
 @app.route('/media/category/<string:category>', methods=['GET'])
+@cached_read
 def get_media_by_category(category):
     """Retourne les médias filtrés par catégorie."""
     # Assurez-vous que la catégorie demandée est valide
-    if category not in manager.categories_allowed:
-        # 400 Bad Request si la catégorie n'est pas supportée
-        abort(400, description=f"Invalid category: {category}. Must be one of {manager.categories_allowed}")
-        
-    media_list = manager.get_media_by_category(category)
-    return jsonify(media_list)
+    _check_category(category)
+    return _media_list_response(category)
+
+
+# --- Endpoint 2 bis: Export complet en streaming ---
+def _since_arg():
+    """Lit ?since= (date ou date-heure ISO) au format des dates de création."""
+    raw_since = request.args.get('since')
+    if raw_since is None:
+        return None
+    try:
+        return datetime.fromisoformat(raw_since).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        abort(400, description=f"Invalid 'since' value: {raw_since}. Expected YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
+
+
+@app.route('/media/export', methods=['GET'])
+def export_media():
+    """
+    Exporte le catalogue en streaming, sans construire la réponse complète en mémoire.
+    - ?format=ndjson (défaut, un média JSON par ligne) ou json (tableau envoyé par morceaux)
+    - ?category= et ?since= (date de création) pour les synchronisations incrémentales
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'json'):
+        abort(400, description=f"Invalid format: {export_format}. Must be 'ndjson' or 'json'")
+    category = request.args.get('category')
+    if category is not None:
+        _check_category(category)
+    # Les médias sont sérialisés directement depuis leur représentation compacte
+    media_iter = manager.iter_media(category=category, since=_since_arg(), as_json=True)
+
+    def generate_ndjson():
+        for media_json in media_iter:
+            yield media_json + '\n'
+
+    def generate_json_array():
+        separator = '['
+        for media_json in media_iter:
+            yield separator + media_json
+            separator = ','
+        yield ']' if separator == ',' else '[]'
+
+    if export_format == 'ndjson':
+        return Response(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson')
+    return Response(stream_with_context(generate_json_array()), mimetype='application/json')
+
+
+# --- Endpoint 2 ter: Statistiques du catalogue ---
+# Nombre maximal d'auteurs dans le classement
+MAX_TOP_AUTHORS = 100
+
+@app.route('/media/stats', methods=['GET'])
+@cached_read
+def get_media_stats():
+    """
+    Retourne les agrégats du catalogue (par catégorie, par décennie, top auteurs).
+    - ?top=N: taille du classement des auteurs (10 par défaut)
+    - ?by_author=true: ajoute le nombre de médias de chaque auteur
+    """
+    raw_top = request.args.get('top', '10')
+    if not raw_top.isdigit():
+        abort(400, description="Query parameter 'top' must be a non-negative integer.")
+    include_authors = request.args.get('by_author', 'false').lower() in ('1', 'true', 'yes')
+    return jsonify(manager.get_media_stats(top=min(int(raw_top), MAX_TOP_AUTHORS), include_authors=include_authors))
+
+
+# --- Endpoint 2 quater: Flux des changements (synchronisation des caches clients) ---
+@app.route('/media/changes', methods=['GET'])
+def get_media_changes():
+    """
+    Retourne les changements postérieurs à ?since=<jeton> (0 par défaut: tout le catalogue):
+    {"version": jeton, "reset": bool, "changes": [...]}. Le client garde `version` pour
+    la requête suivante; avec "reset": true, il remplace tout son cache par `changes`.
+    Le jeton ("<époque>:<version>") change d'époque à chaque redémarrage: reset assuré.
+    """
+    try:
+        return jsonify(manager.get_changes(request.args.get('since', '0')))
+    except ValueError as e:
+        abort(400, description=str(e))
+
+
+# --- Endpoint 2 quinquies: Flux d'événements (Server-Sent Events) ---
+# Intervalle (s) des commentaires de maintien de connexion quand aucun événement n'arrive
+EVENT_KEEPALIVE_SECONDS = 15
+
+
+def _sse_message(event_id, event_name, data):
+    return f"id: {event_id}\nevent: {event_name}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/media/events', methods=['GET'])
+def media_events():
+    """
+    Flux SSE des mutations: événements `add` ({"op": "add", "media": {...}}) et `delete`
+    ({"op": "delete", "id": ID}), d'ID égal au jeton de version des données (comme /media/changes).
+    - En-tête Last-Event-ID (ou ?last_event_id=): rejoue les événements manqués depuis cet ID
+    - Événement `reset` ({"version": jeton}): reprise impossible (ID trop ancien ou d'un autre
+      démarrage du serveur) ou client trop lent; le client se resynchronise via /media/changes
+      (le flux se ferme après un `reset` dû à un retard)
+    """
+    raw_last_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    last_event_id = None
+    if raw_last_id is not None:
+        try:
+            last_event_id = manager.parse_change_token(raw_last_id)
+        except ValueError as e:
+            abort(400, description=str(e))
+    # ID d'un autre démarrage: ses versions ne correspondent pas à celles de ce processus
+    subscription = event_broker.subscribe(last_event_id, reset=raw_last_id is not None and last_event_id is None)
+
+    def reset_message():
+        token = manager.change_token
+        return _sse_message(token, "reset", {"version": token})
+
+    def generate():
+        try:
+            yield ": connected\n\n"
+            if subscription.reset:
+                yield reset_message()
+            while True:
+                item = subscription.get(timeout=EVENT_KEEPALIVE_SECONDS)
+                if item is None:
+                    yield ": keep-alive\n\n"
+                elif item is OVERFLOW:
+                    # Événements perdus: le client doit se resynchroniser avant de se réabonner
+                    yield reset_message()
+                    return
+                else:
+                    event_id, event = item
+                    yield _sse_message(manager.format_change_token(event_id), event["op"], event)
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    # Le générateur n'utilise pas la requête: pas de stream_with_context (le contexte resterait
+    # ouvert pendant toute la durée de l'abonnement)
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 # --- Endpoint 3: Recherche ---
+# Nombre maximal de suggestions renvoyées par la recherche par préfixe
+MAX_PREFIX_RESULTS = 50
+# Nombre maximal de résultats de la recherche plein texte
+MAX_FULLTEXT_RESULTS = 200
+
 @app.route('/media/search', methods=['GET'])
+@cached_read
 def search_media():
-    """Recherche un média par nom exact."""
+    """
+    Recherche un média:
+    - ?name=   nom exact
+    - ?prefix= autocomplétion par préfixe
+    - ?q=      plein texte sur le nom et l'auteur, classé (op=and|or)
+    Les recherches par préfixe et plein texte sont paginées avec ?limit= et ?cursor=.
+    """
+    fields = _fields_arg()
+    query = request.args.get('q')
+    if query is not None:
+        operator = request.args.get('op', 'and')
+        limit = _limit_arg(20, MAX_FULLTEXT_RESULTS)
+        try:
+            media_list, next_cursor = _ranked_page(
+                lambda count, offset: manager.search_media_fulltext(query, operator, count, offset), limit
+            )
+        except ValueError as e:
+            abort(400, description=str(e))
+        return _list_response(media_list, fields, next_cursor)
+
+    prefix = request.args.get('prefix')
+    if prefix is not None:
+        limit = _limit_arg(10, MAX_PREFIX_RESULTS)
+        media_list, next_cursor = _ranked_page(
+            lambda count, offset: manager.search_media_by_prefix(prefix, count, offset), limit
+        )
+        return _list_response(media_list, fields, next_cursor)
+
     name = request.args.get('name')
     if not name:
         # 400 Bad Request si le paramètre 'name' est manquant
-        abort(400, description="Missing 'name' query parameter.")
+        abort(400, description="Missing 'name', 'prefix' or 'q' query parameter.")
         
     media = manager.search_media_by_name(name)
     if media:
-        return jsonify(media)
+        return jsonify(_project(media, fields))
     # 404 Not Found si aucun média n'est trouvé
     abort(404, description=f"Media with name '{name}' not found.")
 
 
 # --- Endpoint 4: Détails par ID ---
 @app.route('/media/<string:media_id>', methods=['GET'])
+@cached_read
 def get_media(media_id):
     """Retourne un média par ID."""
     media = manager.get_media_by_id(media_id)
@@ -62,17 +482,12 @@ def add_media():
         abort(400, description="Request body must be JSON.")
         
     data = request.json
-    required_fields = ["name", "author", "publication_date", "category"]
-    
-    # Vérification des champs obligatoires
-    for field in required_fields:
-        if field not in data:
-            # 400 Bad Request si un champ obligatoire est manquant
-            abort(400, description=f"Missing required field: {field}")
-            
-    # Validation spécifique de la catégorie
-    if data['category'] not in manager.categories_allowed:
-        abort(400, description=f"Invalid category: {data['category']}. Must be one of {manager.categories_allowed}")
+    # Mêmes vérifications que l'import en masse: champs obligatoires, chaînes, catégorie et date valides
+    try:
+        manager.validate_media_input(data)
+    except ValueError as e:
+        # 400 Bad Request si un champ est manquant ou invalide
+        abort(400, description=str(e))
 
     try:
         new_media = manager.add_media(
@@ -92,6 +507,79 @@ def add_media():
         abort(500, description="Internal server error during data processing.")
 
 
+# --- Endpoint 5 bis: Import en masse (POST) ---
+def _bulk_rows():
+    """
+    Lit le corps d'un import: tableau JSON, ou NDJSON (un média par ligne) si Content-Type: application/x-ndjson.
+    Retourne (lignes, erreurs_de_lecture) où erreurs_de_lecture vaut {index: message}.
+    """
+    if request.mimetype == 'application/x-ndjson':
+        rows, parse_errors = [], {}
+        for line_number, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Ligne illisible: rejetée par la validation, avec un message plus précis
+                parse_errors[len(rows)] = f"Invalid JSON on line {line_number}"
+                rows.append(None)
+        return rows, parse_errors
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        abort(400, description="Request body must be a JSON array or NDJSON (application/x-ndjson).")
+    return rows, {}
+
+
+@app.route('/media/bulk', methods=['POST'])
+def add_media_bulk():
+    """
+    Ajoute plusieurs médias en un seul commit. Les lignes invalides sont rejetées
+    individuellement: la réponse liste les médias créés et les erreurs par ligne.
+    """
+    rows, parse_errors = _bulk_rows()
+    try:
+        created, errors = manager.add_media_bulk(rows)
+    except Exception as e:
+        print(f"Server Error during bulk import: {e}")
+        abort(500, description="Internal server error during data processing.")
+    for error in errors:
+        error['error'] = parse_errors.get(error['index'], error['error'])
+    # 201 si au moins un média a été créé, 400 si toutes les lignes sont invalides
+    status = 201 if created or not errors else 400
+    return jsonify(created=created, errors=errors), status
+
+
+# --- Endpoint 5 ter: Lecture et suppression par lot ---
+# Nombre maximal d'IDs par requête de lot
+MAX_BATCH_IDS = 10000
+
+
+def _batch_ids():
+    """Lit le corps {"ids": [...]} d'une requête de lot."""
+    data = request.get_json(silent=True)
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not all(isinstance(media_id, (str, int)) for media_id in ids):
+        abort(400, description="Request body must be a JSON object with an 'ids' list.")
+    if len(ids) > MAX_BATCH_IDS:
+        abort(400, description=f"Too many ids: {len(ids)}. Maximum is {MAX_BATCH_IDS}.")
+    return ids
+
+
+@app.route('/media/batch-get', methods=['POST'])
+def get_media_batch():
+    """Retourne plusieurs médias par ID en une requête, avec la liste des IDs introuvables."""
+    found, missing = manager.get_media_batch(_batch_ids())
+    return jsonify(media=found, missing=missing)
+
+
+@app.route('/media/batch-delete', methods=['POST'])
+def delete_media_batch():
+    """Supprime plusieurs médias en une requête (un seul commit), avec la liste des IDs introuvables."""
+    deleted, missing = manager.delete_media_batch(_batch_ids())
+    return jsonify(deleted=deleted, missing=missing)
+
+
 # --- Endpoint 6: Suppression d'un média (DELETE) ---
 @app.route('/media/<string:media_id>', methods=['DELETE'])
 def delete_media_route(media_id):
@@ -104,8 +592,73 @@ def delete_media_route(media_id):
         abort(404, description=f"Media ID {media_id} not found for deletion.")
 
 
+# --- Endpoint 7: Compteurs de persistance ---
+@app.route('/admin/persistence', methods=['GET'])
+def get_persistence_stats():
+    """Retourne les compteurs de durabilité (flushs et écritures absorbées par flush)."""
+    return jsonify(manager.get_persistence_stats())
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Métriques au format texte Prometheus (latences et tailles par route, persistance, index, sérialisation)."""
+    if not metrics.ENABLED:
+        abort(404, description="Metrics are disabled (LIBRARY_METRICS=0).")
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+def _check_profiling_access():
+    """404 si le profilage est désactivé, 403 sans le jeton d'administration (en-tête X-Profile-Token)."""
+    if not profiling.ENABLED:
+        abort(404, description="Profiling is disabled (set LIBRARY_PROFILING_TOKEN).")
+    if not profiling.token_matches(request.headers.get(PROFILE_HEADER)):
+        abort(403, description="Invalid profiling token.")
+
+
+# Tris acceptés pour le rapport texte d'un profil
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+@app.route('/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Liste les derniers profils de requêtes (du plus récent au plus ancien)."""
+    _check_profiling_access()
+    return jsonify(profile_store.list())
+
+
+@app.route('/admin/profiles/<int:profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """
+    Retourne un profil: rapport texte (?sort=cumulative|tottime|calls) ou, avec ?format=pstats,
+    le fichier binaire à ouvrir avec pstats ou snakeviz.
+    """
+    _check_profiling_access()
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        abort(404, description=f"Profile with ID {profile_id} not found.")
+    if request.args.get('format') == 'pstats':
+        return Response(profile.data, mimetype='application/octet-stream',
+                        headers={'Content-Disposition': f'attachment; filename=profile-{profile_id}.prof'})
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in PROFILE_SORT_KEYS:
+        abort(400, description=f"Invalid sort: {sort}. Must be one of {list(PROFILE_SORT_KEYS)}")
+    return Response(profile.report(sort), mimetype='text/plain')
+
+
+@app.route('/admin/events', methods=['GET'])
+def get_event_stats():
+    """Retourne l'état du flux d'événements (abonnés, événements publiés, abonnés déconnectés)."""
+    return jsonify(event_broker.stats())
+
+
+@app.route('/admin/cache', methods=['GET'])
+def get_cache_stats():
+    """Retourne les compteurs du cache de réponses."""
+    return jsonify(response_cache.stats())
+
+
 # --- Gestion des erreurs personnalisée pour une meilleure réponse ---
 @app.errorhandler(400)
+@app.errorhandler(403)
 @app.errorhandler(404)
 @app.errorhandler(500)
 def handle_error(error):
@@ -116,6 +669,7 @@ def handle_error(error):
 
 if __name__ == '__main__':
     # Le debug=True permet le rechargement automatique du serveur lors des changements de code
-    app.run(debug=True)
+    # threaded=True: LibraryManager protège ses données par un verrou lecteurs/rédacteur
+    app.run(debug=True, threaded=True)
     # STATUT: V1.0 - Le serveur Flask est configuré et les endpoints CRUD de l'API sont prêts.
     
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Compare la représentation des médias en mémoire: dict par média (ancienne forme)
+contre MediaRecord (slots, chaînes partagées).
+
+Usage: python benchmarks/record_layout.py [nombre_de_médias]
+"""
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_record import MediaRecord  # noqa: E402
+
+CATEGORIES = ("Book", "Film", "Magazine")
+
+
+def synthetic_rows(count, seed=42):
+    """Médias synthétiques, avec des chaînes distinctes par média comme après un json.load."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield str(i + 1), {
+            "name": f"Title {i} {rng.randrange(10 ** 6)}",
+            "author": f"Author {rng.randrange(10000)}",
+            "publication_date": f"{rng.randrange(1900, 2025)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+            # Une copie de la chaîne par média, comme après un json.load
+            "category": "".join(CATEGORIES[i % 3]),
+            "creation_date": f"2024-{rng.randrange(1, 13):02d}-01 12:{rng.randrange(60):02d}:00",
+        }
+
+
+def measure(label, build, materialize, serialize, count):
+    # Mémoire retenue par le catalogue (mesurée à part: tracemalloc ralentit la construction)
+    tracemalloc.start()
+    media_data = build(synthetic_rows(count))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del media_data
+
+    started = time.perf_counter()
+    media_data = build(synthetic_rows(count))
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for media_id, media in media_data.items():
+        materialize(media_id, media)
+    materialize_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for media_id, media in media_data.items():
+        serialize(media_id, media)
+    serialize_seconds = time.perf_counter() - started
+
+    print(f"{label:<12} memory {memory / 2 ** 20:8.1f} MiB   build {build_seconds:6.2f} s   "
+          f"as dict {count / materialize_seconds / 1e6:5.2f} M/s   to JSON {count / serialize_seconds / 1e6:5.2f} M/s")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 1_000_000
+    print(f"{count} synthetic media")
+    measure("dict", dict, lambda media_id, media: {"id": media_id, **media},
+            lambda media_id, media: json.dumps({"id": media_id, **media}), count)
+    measure("MediaRecord", lambda rows: {media_id: MediaRecord.from_mapping(media) for media_id, media in rows},
+            lambda media_id, media: media.as_dict(media_id),
+            lambda media_id, media: media.to_json(media_id), count)
+
+
+if __name__ == '__main__':
+    main()
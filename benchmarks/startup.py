@@ -0,0 +1,65 @@
+"""
+Temps de démarrage de LibraryManager: snapshot JSON ('journal') contre snapshot binaire ('binary').
+
+Pour chaque format, mesure le temps jusqu'à:
+    - la fin du constructeur (le serveur peut répondre),
+    - la première lecture par ID,
+    - la fin du chargement complet (catalogue en mémoire et indexé).
+
+Usage: python benchmarks/startup.py [nombre_de_médias]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binary_snapshot import encode_snapshot  # noqa: E402
+from library_manager import LibraryManager  # noqa: E402
+from record_layout import synthetic_rows  # noqa: E402
+from storage import dump_snapshot, write_text_atomic  # noqa: E402
+
+
+def measure(label, storage_mode, data_dir, lookup_id):
+    LibraryManager.DATA_DIR = data_dir
+    LibraryManager.DATA_FILE = os.path.join(data_dir, 'media_data.json')
+    started = time.perf_counter()
+    manager = LibraryManager(storage_mode=storage_mode)
+    constructed = time.perf_counter() - started
+    assert manager.get_media_by_id(lookup_id) is not None
+    first_lookup = time.perf_counter() - started
+    manager.get_category_counts()  # attend la fin du chargement
+    loaded = time.perf_counter() - started
+    manager.close()
+    print(f"{label:<8} ready {constructed:7.3f} s   first lookup {first_lookup:7.3f} s   fully loaded {loaded:7.3f} s")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    count = int(argv[0]) if argv else 200_000
+    media_data = dict(synthetic_rows(count))
+    lookup_id = str(count // 2)
+    root = tempfile.mkdtemp(prefix='library-startup-')
+    try:
+        json_dir = os.path.join(root, 'json')
+        binary_dir = os.path.join(root, 'binary')
+        os.makedirs(json_dir)
+        os.makedirs(binary_dir)
+        write_text_atomic(os.path.join(json_dir, 'media_data.json'), dump_snapshot(media_data))
+        write_text_atomic(os.path.join(binary_dir, 'media_data.snapshot'), encode_snapshot(media_data))
+        del media_data
+        for directory in (json_dir, binary_dir):
+            size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+            print(f"{os.path.basename(directory):<8} snapshot {size / 2 ** 20:8.1f} MiB")
+
+        print(f"{count} synthetic media")
+        measure('json', 'journal', json_dir, lookup_id)
+        measure('binary', 'binary', binary_dir, lookup_id)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""
+Suite de benchmarks de LibraryManager et de l'API REST, sur des catalogues synthétiques.
+
+Pour chaque taille de catalogue, mesure les opérations directement sur LibraryManager
+puis à travers le client de test Flask (routage, sérialisation JSON, cache de réponses):
+latences p50/p99, opérations par seconde et pic d'allocation mémoire de l'opération.
+Les résultats sont enregistrés en JSON et peuvent être comparés à une exécution de référence.
+
+Usage:
+    python benchmarks/suite.py [--sizes 1000,10000,100000,1000000] [--output results.json]
+                               [--baseline baseline.json] [--threshold 10] [--fail-on-regression]
+
+Les catalogues sont générés avec une graine fixe (mêmes données d'une exécution à l'autre).
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from library_manager import LibraryManager  # noqa: E402
+from record_layout import synthetic_rows  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from storage import dump_snapshot, write_text_atomic  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+# Chaque opération est répétée au moins MIN_ITERATIONS fois et jusqu'à épuiser le budget de temps
+MIN_ITERATIONS = 3
+MAX_ITERATIONS = 2000
+DEFAULT_TIME_BUDGET = 1.0
+# Nombre de noms différents utilisés par la recherche exacte
+SEARCH_SAMPLE = 100
+
+
+def percentile(sorted_samples, fraction):
+    """Percentile au rang le plus proche sur des échantillons triés."""
+    rank = max(1, math.ceil(fraction * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def run_timed(operation, time_budget):
+    """Exécute `operation(i)` jusqu'à épuiser le budget. Retourne les durées (secondes) de chaque appel."""
+    samples = []
+    deadline = time.perf_counter() + time_budget
+    while len(samples) < MAX_ITERATIONS and (len(samples) < MIN_ITERATIONS or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        operation(len(samples))
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def peak_allocation(operation):
+    """Pic de mémoire allouée (octets) pendant un appel de `operation`, mesuré à part avec tracemalloc."""
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        operation(0)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - baseline)
+
+
+def summarize(size, name, samples, peak_bytes):
+    ordered = sorted(samples)
+    return {
+        "size": size,
+        "name": name,
+        "iterations": len(samples),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4),
+        "ops_per_sec": round(len(samples) / sum(samples), 2) if sum(samples) else None,
+        "peak_alloc_bytes": peak_bytes,
+    }
+
+
+class Benchmark:
+    """Une taille de catalogue: génère les données dans un répertoire temporaire et mesure chaque opération."""
+
+    def __init__(self, size, storage_mode, durability, time_budget, measure_memory=True):
+        self.size = size
+        self.storage_mode = storage_mode
+        self.durability = durability
+        self.time_budget = time_budget
+        self.measure_memory = measure_memory
+        self.results = []
+        self.root = tempfile.mkdtemp(prefix=f'library-bench-{size}-')
+        self.data_dir = os.path.join(self.root, 'data')
+        media_data = dict(synthetic_rows(size))
+        rng = random.Random(size)
+        self.search_names = [media_data[str(rng.randrange(1, size + 1))]["name"] for _ in range(SEARCH_SAMPLE)]
+        # Catalogue de départ, recopié avant chaque série: les mutations d'une série ne faussent pas la suivante
+        self.catalog_file = os.path.join(self.root, 'catalog.json')
+        write_text_atomic(self.catalog_file, dump_snapshot(media_data))
+
+    def close(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def reset_data(self):
+        """Remet le répertoire de données dans l'état initial (catalogue synthétique seul)."""
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+        os.makedirs(self.data_dir)
+        shutil.copyfile(self.catalog_file, os.path.join(self.data_dir, 'media_data.json'))
+
+    def new_manager(self):
+        LibraryManager.DATA_DIR = self.data_dir
+        LibraryManager.DATA_FILE = os.path.join(self.data_dir, 'media_data.json')
+        return LibraryManager(storage_mode=self.storage_mode, durability=self.durability)
+
+    def measure(self, name, operation, time_budget=None):
+        samples = run_timed(operation, self.time_budget if time_budget is None else time_budget)
+        peak_bytes = peak_allocation(operation) if self.measure_memory else None
+        result = summarize(self.size, name, samples, peak_bytes)
+        self.results.append(result)
+        print(f"{self.size:>9}  {name:<34} p50 {result['p50_ms']:10.3f} ms   p99 {result['p99_ms']:10.3f} ms   "
+              f"{result['ops_per_sec'] or 0:>11.1f} ops/s   n={result['iterations']}", flush=True)
+
+    def run_direct(self):
+        """Opérations appelées directement sur LibraryManager."""
+        self.reset_data()
+        manager = self.new_manager()
+        try:
+            # Démarrage: lecture du stockage seule, puis construction complète (chargement + index)
+            self.measure("direct load_data", lambda i: manager._load_data())
+            self.measure("direct startup", lambda i: self.new_manager().close(), time_budget=0)
+            self.measure("direct get_all_media", lambda i: manager.get_all_media())
+            self.measure("direct get_media_by_category", lambda i: manager.get_media_by_category("Film"))
+            self.measure("direct search_media_by_name",
+                         lambda i: manager.search_media_by_name(self.search_names[i % SEARCH_SAMPLE]))
+            added = []
+            self.measure("direct add_media", lambda i: added.append(
+                manager.add_media(f"Bench {i}", "Bench Author", "2024-01-01", "Book")['id']))
+            # Supprime les médias ajoutés (le catalogue retrouve sa taille), puis des médias existants
+            to_delete = [str(media_id) for media_id in range(1, self.size + 1)] + added
+            self.measure("direct delete_media", lambda i: manager.delete_media(to_delete.pop()))
+        finally:
+            manager.close()
+
+    def run_api(self):
+        """Mêmes opérations à travers le client de test Flask (serveur complet, sans réseau)."""
+        # Le module crée son propre Manager à l'import: dans un répertoire à part, puis remplacé
+        LibraryManager.DATA_DIR = os.path.join(self.root, 'server')
+        LibraryManager.DATA_FILE = os.path.join(LibraryManager.DATA_DIR, 'media_data.json')
+        import backend_server
+        self.reset_data()
+        manager = self.new_manager()
+        original = backend_server.manager, backend_server.response_cache
+        # Sans cache de réponses: mesure le travail de chaque requête. La variante "cached" le réactive.
+        backend_server.manager, backend_server.response_cache = manager, ResponseCache(max_bytes=0)
+        client = backend_server.app.test_client()
+
+        def request(method, path, expected, **kwargs):
+            response = client.open(path, method=method, **kwargs)
+            if response.status_code != expected:
+                raise RuntimeError(f"{method} {path}: HTTP {response.status_code}")
+            return response
+
+        try:
+            self.measure("api GET /media", lambda i: request('GET', '/media', 200).get_data())
+            self.measure("api GET /media/category/Film", lambda i: request('GET', '/media/category/Film', 200).get_data())
+            self.measure("api GET /media?limit=100", lambda i: request('GET', '/media?limit=100', 200).get_data())
+            self.measure("api GET /media/search?name=", lambda i: request(
+                'GET', '/media/search', 200, query_string={"name": self.search_names[i % SEARCH_SAMPLE]}).get_data())
+            added = []
+            self.measure("api POST /media", lambda i: added.append(request(
+                'POST', '/media', 201, json={"name": f"Bench {i}", "author": "Bench Author",
+                                             "publication_date": "2024-01-01", "category": "Book"}).get_json()['id']))
+            to_delete = [str(media_id) for media_id in range(1, self.size + 1)] + added
+            self.measure("api DELETE /media/<id>", lambda i: request('DELETE', f'/media/{to_delete.pop()}', 204))
+            backend_server.response_cache = ResponseCache()
+            self.measure("api GET /media (cached)", lambda i: request('GET', '/media', 200).get_data())
+        finally:
+            backend_server.manager, backend_server.response_cache = original
+            manager.close()
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Affiche l'écart avec la référence par (taille, opération). Retourne le nombre de régressions."""
+    reference = {(result["size"], result["name"]): result for result in baseline["results"]}
+    regressions = 0
+    print(f"\nComparison with baseline ({baseline['meta'].get('revision')}, {baseline['meta'].get('date')}):")
+    for result in results:
+        previous = reference.get((result["size"], result["name"]))
+        if previous is None or not previous["p50_ms"]:
+            continue
+        change = (result["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  improved"
+        print(f"{result['size']:>9}  {result['name']:<34} p50 {previous['p50_ms']:10.3f} -> "
+              f"{result['p50_ms']:10.3f} ms ({change:+6.1f} %){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of LibraryManager and the REST API.")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated catalog sizes (default: %(default)s)")
+    parser.add_argument('--storage', default='journal', help="storage mode (default: %(default)s)")
+    parser.add_argument('--durability', default='async',
+                        help="durability policy; 'fsync' includes disk latency in writes (default: %(default)s)")
+    parser.add_argument('--time-budget', type=float, default=DEFAULT_TIME_BUDGET,
+                        help="seconds spent on each operation (default: %(default)s)")
+    parser.add_argument('--only', choices=('direct', 'api'), help="run only direct or API benchmarks")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc peak measurement")
+    parser.add_argument('--output', default=None, help="JSON results file (default: benchmarks/results-<date>.json)")
+    parser.add_argument('--baseline', help="previous JSON results to compare with")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="p50 change (%%) reported as a regression (default: %(default)s)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="exit with status 1 on regression")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    results = []
+    for size in sizes:
+        benchmark = Benchmark(size, args.storage, args.durability, args.time_budget, not args.no_memory)
+        try:
+            if args.only != 'api':
+                benchmark.run_direct()
+            if args.only != 'direct':
+                benchmark.run_api()
+        finally:
+            benchmark.close()
+        results.extend(benchmark.results)
+
+    report = {
+        "meta": {
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": args.storage,
+            "durability": args.durability,
+            "time_budget": args.time_budget,
+            # Pic de mémoire résidente du processus (toutes tailles confondues)
+            "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(ROOT, 'benchmarks', f"results-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
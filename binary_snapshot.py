@@ -0,0 +1,106 @@
+"""
+Format binaire indexé des snapshots du catalogue (mode de stockage 'binary').
+
+Disposition du fichier (entiers little-endian):
+    en-tête  : MAGIC (8 octets), nombre de médias (u64), position et taille de la zone
+               des médias (u64, u64), position de l'index (u64)
+    médias   : un objet JSON compact {ID: média}, médias triés par ID
+    index    : pour chaque média, dans le même ordre, position de sa clé (u64),
+               taille de la clé JSON (u32) et taille du média JSON (u32)
+
+Le chargement complet décode la zone des médias en un seul appel (json.loads, en C);
+l'index permet de lire un média par ID (recherche dichotomique dans le fichier projeté
+en mémoire) sans décoder le reste du snapshot.
+"""
+import json
+import mmap
+import os
+import struct
+
+from media_indexes import id_sort_key
+
+MAGIC = b'LMSNAP2\n'
+FIELDS = ("name", "author", "publication_date", "category", "creation_date")
+
+_HEADER = struct.Struct('<8sQQQQ')
+_INDEX_ENTRY = struct.Struct('<QII')
+
+
+class SnapshotFormatError(ValueError):
+    """Fichier qui n'est pas un snapshot binaire valide."""
+
+
+def _json_object(value):
+    """Médias stockés sous forme de Mapping (ex: MediaRecord) -> objets JSON."""
+    return dict(value.items())
+
+
+def encode_snapshot(media_data):
+    """Sérialise {ID: média} au format binaire indexé (médias triés par ID). Retourne des bytes."""
+    entries = []
+    index = []
+    position = _HEADER.size + 1
+    for media_id in sorted(media_data, key=id_sort_key):
+        key = json.dumps(media_id).encode('utf-8')
+        value = json.dumps(media_data[media_id], separators=(',', ':'), default=_json_object).encode('utf-8')
+        entries.append(key + b':' + value)
+        index.append(_INDEX_ENTRY.pack(position, len(key), len(value)))
+        position += len(key) + 1 + len(value) + 1
+    records = b'{' + b','.join(entries) + b'}'
+    header = _HEADER.pack(MAGIC, len(entries), _HEADER.size, len(records), _HEADER.size + len(records))
+    return header + records + b''.join(index)
+
+
+class SnapshotReader:
+    """
+    Lecture d'un snapshot binaire projeté en mémoire (mmap).
+    `get` ne décode que les IDs visités par la recherche dichotomique, puis le média trouvé;
+    `load` décode tous les médias d'un coup.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise SnapshotFormatError(f"'{path}' is not a binary snapshot.")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self._records_offset, self._records_size, self._index_offset = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or self._index_offset + self._count * _INDEX_ENTRY.size > size:
+            self._map.close()
+            raise SnapshotFormatError(f"'{path}' is not a binary snapshot.")
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, rank):
+        return _INDEX_ENTRY.unpack_from(self._map, self._index_offset + rank * _INDEX_ENTRY.size)
+
+    def _id_at(self, rank):
+        offset, key_length, _ = self._entry(rank)
+        return json.loads(self._map[offset:offset + key_length])
+
+    def get(self, media_id):
+        """Retourne le média d'ID `media_id` (dict), ou None. O(log n) lectures dans le fichier."""
+        key = id_sort_key(media_id)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if id_sort_key(self._id_at(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._id_at(low) == media_id:
+            offset, key_length, value_length = self._entry(low)
+            start = offset + key_length + 1
+            return json.loads(self._map[start:start + value_length])
+        return None
+
+    def load(self):
+        """Décode tout le snapshot: {ID: média}, dans l'ordre des IDs."""
+        return json.loads(self._map[self._records_offset:self._records_offset + self._records_size])
+
+    def close(self):
+        self._map.close()
+# STATUT: V1.0 - Snapshot binaire avec index des positions par ID.
@@ -0,0 +1,119 @@
+import queue
+import threading
+from collections import deque
+
+# Nombre maximal d'événements en attente par abonné: au-delà, l'abonné trop lent est déconnecté
+DEFAULT_QUEUE_SIZE = 1000
+# Nombre d'événements récents conservés pour la reprise (Last-Event-ID)
+DEFAULT_HISTORY_SIZE = 1000
+
+# Marqueur remis à un abonné qui a perdu des événements (file pleine): il doit se resynchroniser
+OVERFLOW = object()
+
+
+class Subscription:
+    """
+    Abonnement d'un client au flux d'événements. Les événements arrivent dans une file bornée;
+    `reset` vaut True si l'abonné doit d'abord se resynchroniser (reprise impossible).
+    """
+
+    def __init__(self, queue_size, reset=False):
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.reset = reset
+        self.overflowed = False
+
+    def _offer(self, item):
+        """Dépose un événement sans jamais bloquer. Retourne False si la file est pleine."""
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.overflowed = True
+            return False
+
+    def get(self, timeout=None):
+        """
+        Retourne le prochain événement (ID, événement), None si aucun n'arrive avant `timeout`,
+        ou OVERFLOW si des événements ont été perdus.
+        """
+        if self.overflowed:
+            return OVERFLOW
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return OVERFLOW if self.overflowed else None
+
+
+class EventBroker:
+    """
+    Diffuse les mutations du catalogue à des abonnés (flux Server-Sent Events).
+
+    `publish` ne bloque jamais: un abonné dont la file est pleine est retiré de la diffusion
+    et reçoit OVERFLOW. Les IDs d'événements sont croissants (versions des données): un
+    abonné qui se reconnecte avec le dernier ID reçu obtient les événements manqués, tant
+    qu'ils sont encore dans l'historique. Sans `start_id`, l'historique commence au premier
+    événement publié.
+    """
+
+    def __init__(self, start_id=None, queue_size=DEFAULT_QUEUE_SIZE, history_size=DEFAULT_HISTORY_SIZE):
+        self.queue_size = queue_size
+        self._history = deque(maxlen=history_size)
+        # L'historique couvre tous les événements d'ID > `_history_start`
+        self._history_start = start_id
+        self._last_id = start_id
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def publish(self, event_id, event):
+        """Diffuse `event` sous l'ID `event_id` (croissant) à tous les abonnés."""
+        with self._lock:
+            if self._history_start is None:
+                self._history_start = self._last_id = event_id - 1
+            if len(self._history) == self._history.maxlen:
+                self._history_start = self._history[0][0]
+            self._history.append((event_id, event))
+            self._last_id = event_id
+            self.published += 1
+            for subscription in list(self._subscribers):
+                if not subscription._offer((event_id, event)):
+                    self._subscribers.discard(subscription)
+                    self.dropped_subscribers += 1
+
+    def subscribe(self, last_event_id=None, reset=False):
+        """
+        Ouvre un abonnement. Avec `last_event_id`, les événements publiés depuis sont rejoués;
+        si l'historique ne les couvre plus (ou si l'ID est inconnu), l'abonnement est marqué `reset`.
+        `reset` force ce marquage (ex: ID venant d'un autre démarrage du serveur).
+        """
+        with self._lock:
+            if reset:
+                subscription = Subscription(self.queue_size, reset=True)
+            elif last_event_id is None:
+                subscription = Subscription(self.queue_size)
+            elif self._history_start is not None and self._history_start <= last_event_id <= self._last_id:
+                subscription = Subscription(self.queue_size)
+                for event_id, event in self._history:
+                    if event_id > last_event_id and not subscription._offer((event_id, event)):
+                        break
+            else:
+                subscription = Subscription(self.queue_size, reset=True)
+            if not subscription.overflowed:
+                self._subscribers.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self):
+        """Compteurs du flux: abonnés connectés, événements publiés, abonnés trop lents déconnectés."""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped_subscribers": self.dropped_subscribers,
+                "last_event_id": self._last_id,
+            }
+# STATUT: V1.0 - Diffusion des mutations avec files bornées par abonné et reprise par ID.
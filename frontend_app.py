@@ -1,12 +1,46 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import queue
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date 
 
 # --- Configuration ---
 # Adresse de base de votre API Flask
 API_BASE_URL = "http://127.0.0.1:5000"
+# Délais réseau (connexion, lecture) en secondes: un serveur lent ne bloque jamais indéfiniment
+REQUEST_TIMEOUT = (3.05, 15)
+# Nombre de requêtes HTTP exécutées en parallèle (et de connexions gardées ouvertes)
+HTTP_WORKERS = 4
+# Fréquence (ms) à laquelle l'interface récupère les réponses des requêtes en arrière-plan
+RESULT_POLL_MS = 30
+# Nombre de médias demandés par page (la page suivante est chargée en approchant du bas de la liste)
+PAGE_SIZE = 200
+# Position de défilement (fraction de la liste) à partir de laquelle la page suivante est demandée
+PREFETCH_THRESHOLD = 0.9
+# Intervalle (ms) entre deux synchronisations du cache local avec le flux de changements du serveur
+SYNC_INTERVAL_MS = 5000
+
+
+def id_sort_key(media_id):
+    """Ordre des IDs du serveur (pagination): numériques par valeur, puis les autres."""
+    media_id = str(media_id)
+    if media_id.isdigit():
+        return (0, int(media_id), media_id)
+    return (1, 0, media_id)
+
+
+def create_session():
+    """Session HTTP partagée: les connexions au serveur sont réutilisées (keep-alive)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 # --- Classe de l'application Tkinter (Objet principal du GUI) ---
 class LibraryApp:
@@ -17,6 +51,34 @@ class LibraryApp:
 
         self.categories = ["All", "Book", "Film", "Magazine"]
         self.current_media_list = [] # Stocke la liste des médias chargés
+        # Lignes affichées {ID: valeurs}: permet de ne mettre à jour que ce qui a changé
+        self._rows = {}
+        # Vue paginée courante: endpoint, curseur de la page suivante, page en cours de chargement
+        self._view_endpoint = None
+        self._next_cursor = None
+        self._page_loading = False
+        # Cache local {ID: média}, tenu à jour par le flux GET /media/changes: le filtrage par
+        # catégorie et les détails sont servis sans requête. `_cache_keys` garde l'ordre des IDs.
+        self._cache = {}
+        self._cache_keys = []
+        self._cache_version = None  # None tant que le cache n'a pas été rempli
+        self._sync_in_flight = False
+        self._sync_timer = None
+        # Vue servie par le cache: catégorie affichée ("All" ou une catégorie), liste et lignes affichées
+        self._local_view = None
+        self._local_list = []
+        self._local_shown = 0
+
+        # Requêtes HTTP en arrière-plan: les réponses reviennent au thread Tk via une file,
+        # relevée périodiquement avec after() (Tk n'est pas thread-safe)
+        self.session = create_session()
+        self.executor = ThreadPoolExecutor(max_workers=HTTP_WORKERS, thread_name_prefix="library-http")
+        self._results = queue.Queue()
+        self._pending_requests = 0
+        # Jeton de génération de la liste affichée: une réponse d'une génération dépassée est ignorée
+        self._list_generation = 0
+        self._list_future = None
+        master.protocol("WM_DELETE_WINDOW", self.close)
 
         # 1. Cadre de Contrôle (Haut)
         control_frame = ttk.Frame(master, padding="10 10 10 10")
@@ -43,7 +105,9 @@ class LibraryApp:
         ttk.Button(control_frame, text="Rechercher", command=self.search_media).pack(side='left', padx=5)
 
         # 2. Zone d'affichage (Milieu) - Treeview (Table)
-        self.tree = ttk.Treeview(master, columns=("ID", "Name", "Author", "Date", "Category"), show='headings')
+        tree_frame = ttk.Frame(master)
+        tree_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        self.tree = ttk.Treeview(tree_frame, columns=("ID", "Name", "Author", "Date", "Category"), show='headings')
         self.tree.heading("ID", text="ID", anchor=tk.W)
         self.tree.heading("Name", text="Nom", anchor=tk.W)
         self.tree.heading("Author", text="Auteur / Réalisateur", anchor=tk.W)
@@ -57,7 +121,11 @@ class LibraryApp:
         self.tree.column("Date", width=120, stretch=tk.NO)
         self.tree.column("Category", width=100, stretch=tk.NO)
 
-        self.tree.pack(fill='both', expand=True, padx=10, pady=10)
+        # Barre de défilement: en approchant du bas, la page suivante est chargée
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
         
         # Correction pour le double-clic (liaison de l'événement)
         self.tree.bind("<Double-1>", self.show_media_details)
@@ -70,33 +138,119 @@ class LibraryApp:
         ttk.Button(action_frame, text="Nouveau Média", command=self.open_create_window).pack(side='left', padx=10)
         ttk.Button(action_frame, text="Supprimer Sélectionné", command=self.delete_selected_media).pack(side='left', padx=10)
 
+        # Indicateur de chargement (visible tant qu'une requête est en cours)
+        self.status_var = tk.StringVar(master, value="")
+        ttk.Label(action_frame, textvariable=self.status_var).pack(side='right', padx=10)
+        self.progress = ttk.Progressbar(action_frame, mode='indeterminate', length=120)
+
         # Chargement initial des données
+        self.master.after(RESULT_POLL_MS, self._process_results)
         self.load_media()
+        self.sync_cache()
 
     # --- Fonctions de Communication HTTP ---
 
-    def _safe_request(self, method, endpoint, **kwargs):
-        """Fonction utilitaire pour gérer l'erreur de connexion HTTP et les erreurs API."""
+    def _perform_request(self, method, endpoint, **kwargs):
+        """Exécute la requête HTTP (thread de travail). Ne touche jamais à l'interface."""
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        return self.session.request(method, f"{API_BASE_URL}{endpoint}", **kwargs)
+
+    def request_async(self, method, endpoint, on_response, list_request=False, silent=False, **kwargs):
+        """
+        Lance une requête en arrière-plan; `on_response(response)` est appelé dans le thread Tk
+        (response vaut None en cas d'erreur, déjà signalée à l'utilisateur). Une requête `silent`
+        (synchronisation de fond) n'affiche ni indicateur de chargement ni erreur.
+        Une requête `list_request` remplace la précédente: si celle-ci n'a pas encore démarré
+        elle est annulée, sinon sa réponse (devenue obsolète) est ignorée.
+        """
+        generation = None
+        if list_request:
+            generation = self._invalidate_list()
+
+        future = self.executor.submit(self._perform_request, method, endpoint, **kwargs)
+        if list_request:
+            self._list_future = future
+        if not silent:
+            self._request_started()
+        future.add_done_callback(
+            lambda done: done.cancelled() or self._results.put((done, on_response, generation, silent))
+        )
+        return future
+
+    def _invalidate_list(self):
+        """Rend obsolète la requête de liste en cours (annulée si elle n'a pas démarré). Retourne la nouvelle génération."""
+        self._list_generation += 1
+        if self._list_future is not None and self._list_future.cancel():
+            self._request_finished()
+        self._list_future = None
+        return self._list_generation
+
+    def _process_results(self):
+        """Traite les réponses arrivées (thread Tk), puis se replanifie."""
         try:
-            response = requests.request(method, f"{API_BASE_URL}{endpoint}", **kwargs)
-            
-            # Vérifie les erreurs HTTP (4xx et 5xx)
-            if 400 <= response.status_code < 600: 
+            while True:
+                future, on_response, generation, silent = self._results.get_nowait()
+                if not silent:
+                    self._request_finished()
+                if generation is not None and generation != self._list_generation:
+                    continue  # Réponse obsolète: l'utilisateur a déjà demandé autre chose
                 try:
-                    error_data = response.json().get('error', response.text)
-                    if response.status_code != 404 and response.status_code != 204: 
-                        messagebox.showerror("Erreur API", f"Requête échouée ({response.status_code}): {error_data}")
-                except json.JSONDecodeError:
-                    messagebox.showerror("Erreur API", f"Requête échouée ({response.status_code}). Le serveur n'a pas retourné de JSON.")
-                return None
-                
-            return response
-        except requests.exceptions.ConnectionError:
+                    response = future.result()
+                    if silent:
+                        # Requête de fond (synchronisation): les erreurs sont ignorées, elle sera retentée
+                        response = response if response.status_code < 400 else None
+                    else:
+                        response = self._check_response(response)
+                except Exception as e:
+                    if not silent:
+                        self._report_request_error(e)
+                    response = None
+                on_response(response)
+        except queue.Empty:
+            pass
+        self.master.after(RESULT_POLL_MS, self._process_results)
+
+    @staticmethod
+    def _report_request_error(error):
+        if isinstance(error, requests.exceptions.ConnectionError):
             messagebox.showerror("Erreur de Connexion", "Impossible de se connecter au serveur Flask. Assurez-vous que backend_server.py est en cours d'exécution.")
-            return None
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Une erreur inattendue s'est produite: {e}")
-            return None
+        elif isinstance(error, requests.exceptions.Timeout):
+            messagebox.showerror("Erreur de Connexion", "Le serveur Flask ne répond pas (délai dépassé).")
+        else:
+            messagebox.showerror("Erreur", f"Une erreur inattendue s'est produite: {error}")
+
+    def _check_response(self, response):
+        """Gère les erreurs API (4xx et 5xx). Retourne la réponse, ou None si elle est en erreur."""
+        if 400 <= response.status_code < 600: 
+            try:
+                error_data = response.json().get('error', response.text)
+                if response.status_code != 404 and response.status_code != 204: 
+                    messagebox.showerror("Erreur API", f"Requête échouée ({response.status_code}): {error_data}")
+            except json.JSONDecodeError:
+                messagebox.showerror("Erreur API", f"Requête échouée ({response.status_code}). Le serveur n'a pas retourné de JSON.")
+            # Le 404 reste visible de l'appelant (ex: recherche sans résultat)
+            return response if response.status_code == 404 else None
+        return response
+
+    def _request_started(self):
+        self._pending_requests += 1
+        if self._pending_requests == 1:
+            self.status_var.set("Chargement...")
+            self.progress.pack(side='right')
+            self.progress.start(10)
+
+    def _request_finished(self):
+        self._pending_requests -= 1
+        if self._pending_requests == 0:
+            self.progress.stop()
+            self.progress.pack_forget()
+            self.status_var.set("")
+
+    def close(self):
+        """Ferme la fenêtre: abandonne les requêtes en attente et libère les connexions."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        self.master.destroy()
 
     def load_media(self, endpoint="/media", reset_category=False):
         """Charge tous les médias ou selon un endpoint spécifique. Réinitialise la catégorie si demandé."""
@@ -106,8 +260,23 @@ class LibraryApp:
             # Réinitialise la variable du Combobox à "All"
             self.category_var.set(self.categories[0]) 
 
-        response = self._safe_request('GET', endpoint)
+        if self._cache_version is not None:
+            # Cache rempli: la liste est servie localement, puis rafraîchie par la synchronisation
+            self._show_local(self.category_var.get())
+            self.sync_cache()
+            return
 
+        # Seule la première page est demandée; les suivantes le sont au défilement
+        self._local_view = None
+        same_view = endpoint == self._view_endpoint
+        self._view_endpoint = endpoint
+        self._next_cursor = None
+        self._page_loading = False
+        self.request_async('GET', endpoint, lambda response: self._on_media_loaded(response, same_view),
+                           list_request=True, params={"limit": PAGE_SIZE})
+
+    def _on_media_loaded(self, response, same_view):
+        """Affiche la première page reçue (thread Tk)."""
         if response is None:
             self.update_treeview([]) 
             return
@@ -121,11 +290,124 @@ class LibraryApp:
                  self.current_media_list = data
             else:
                  self.current_media_list = []
-                 
-            self.update_treeview(self.current_media_list)
+            self._next_cursor = response.headers.get('X-Next-Cursor')
+
+            # Rafraîchissement de la même vue: les lignes au-delà de cette page restent affichées
+            # (elles seront resynchronisées avec leur page); sinon, la liste est remplacée
+            until = self._next_cursor if same_view else None
+            self.update_treeview(self.current_media_list, until=until)
         else:
              self.update_treeview([])
 
+    def _on_tree_scroll(self, first, last):
+        """Suit le défilement de la table et demande la page suivante près du bas."""
+        self.scrollbar.set(first, last)
+        if float(last) >= PREFETCH_THRESHOLD:
+            self._load_next_page()
+
+    def _load_next_page(self):
+        """Demande la page suivante de la vue courante (une seule à la fois)."""
+        if self._local_view is not None:
+            self._show_more_local()
+            return
+        if self._next_cursor is None or self._page_loading:
+            return
+        self._page_loading = True
+        generation, cursor = self._list_generation, self._next_cursor
+        self.request_async('GET', self._view_endpoint,
+                           lambda response: self._on_page_loaded(generation, cursor, response),
+                           params={"limit": PAGE_SIZE, "cursor": cursor})
+
+    def _on_page_loaded(self, generation, cursor, response):
+        """Ajoute une page à la table (thread Tk). Ignorée si la vue a changé entre-temps."""
+        if generation != self._list_generation:
+            return
+        self._page_loading = False
+        if response is None or response.status_code != 200:
+            return
+        page = response.json()
+        self.current_media_list.extend(page)
+        self._next_cursor = response.headers.get('X-Next-Cursor')
+        self.update_treeview(page, after=cursor, until=self._next_cursor)
+
+    # --- Cache local et flux de changements ---
+
+    def sync_cache(self):
+        """Demande au serveur les changements depuis la dernière version connue (tout le catalogue la première fois)."""
+        if self._sync_in_flight:
+            return
+        self._sync_in_flight = True
+        self.request_async('GET', "/media/changes", self._on_changes, silent=True,
+                           params={"since": self._cache_version or 0})
+
+    def _on_changes(self, response):
+        """Applique les changements reçus au cache, rafraîchit la vue locale et planifie la prochaine synchronisation."""
+        self._sync_in_flight = False
+        if response is not None:
+            feed = response.json()
+            if feed["reset"]:
+                self._cache.clear()
+                self._cache_keys.clear()
+            for change in feed["changes"]:
+                if change["op"] == "add":
+                    self._cache_put(change["media"])
+                else:
+                    self._cache_remove(change["id"])
+            first_fill = self._cache_version is None
+            self._cache_version = feed["version"]
+            if self._local_view is not None:
+                self._show_local(self._local_view, keep_position=True)
+            elif first_fill and self._view_endpoint is not None:
+                # La liste paginée du serveur est remplacée par la vue locale
+                self._show_local(self.category_var.get())
+        # Une seule synchronisation périodique planifiée, même après une synchronisation immédiate
+        if self._sync_timer is not None:
+            self.master.after_cancel(self._sync_timer)
+        self._sync_timer = self.master.after(SYNC_INTERVAL_MS, self.sync_cache)
+
+    def _cache_put(self, media):
+        media_id = str(media["id"])
+        if media_id not in self._cache:
+            key = id_sort_key(media_id)
+            self._cache_keys.insert(bisect_left(self._cache_keys, key), key)
+        self._cache[media_id] = media
+
+    def _cache_remove(self, media_id):
+        if self._cache.pop(media_id, None) is not None:
+            key = id_sort_key(media_id)
+            del self._cache_keys[bisect_left(self._cache_keys, key)]
+
+    def _show_local(self, category, keep_position=False):
+        """
+        Affiche les médias du cache (d'une catégorie, ou tous pour "All"), triés par ID.
+        Les lignes sont ajoutées par pages au défilement; `keep_position` garde au moins
+        autant de lignes qu'avant (rafraîchissement après synchronisation).
+        """
+        self._invalidate_list()
+        self._view_endpoint = None
+        self._next_cursor = None
+        self._page_loading = False
+        cache = self._cache
+        media_list = [cache[media_id] for _, _, media_id in self._cache_keys]
+        if category != "All":
+            media_list = [media for media in media_list if media.get('category') == category]
+        shown = max(PAGE_SIZE, self._local_shown) if keep_position and self._local_view == category else PAGE_SIZE
+        self._local_view = category
+        self._local_list = media_list
+        self._local_shown = min(shown, len(media_list))
+        self.current_media_list = media_list[:self._local_shown]
+        self.update_treeview(self.current_media_list)
+
+    def _show_more_local(self):
+        """Ajoute la page suivante de la vue locale à la table."""
+        if self._local_shown >= len(self._local_list):
+            return
+        page = self._local_list[self._local_shown:self._local_shown + PAGE_SIZE]
+        after = self._local_list[self._local_shown - 1]['id'] if self._local_shown else None
+        self._local_shown += len(page)
+        self.current_media_list.extend(page)
+        self.update_treeview(page, after=after, until=page[-1]['id'])
+
     def filter_media(self, event=None):
         """Filtre les médias selon la catégorie sélectionnée (Corrigé)."""
         selected_category = self.category_var.get() 
@@ -146,9 +428,15 @@ class LibraryApp:
             
         # Réinitialise la catégorie affichée pour montrer qu'on est en mode recherche
         self.category_var.set("All") 
+        self._local_view = None
+        self._view_endpoint = None
+        self._next_cursor = None
 
-        response = self._safe_request('GET', f"/media/search?name={search_name}")
-        
+        self.request_async('GET', "/media/search", lambda response: self._on_search_result(search_name, response),
+                           list_request=True, params={"name": search_name})
+
+    def _on_search_result(self, search_name, response):
+        """Affiche le résultat de la recherche (thread Tk)."""
         if response is None:
             return
 
@@ -173,12 +461,18 @@ class LibraryApp:
         if not messagebox.askyesno("Confirmation", f"Êtes-vous sûr de vouloir supprimer le média ID {media_id}?"):
             return
 
-        response = self._safe_request('DELETE', f"/media/{media_id}")
+        self.request_async('DELETE', f"/media/{media_id}", lambda response: self._on_media_deleted(media_id, response))
 
+    def _on_media_deleted(self, media_id, response):
+        """Retire la ligne puis resynchronise la liste après une suppression réussie (thread Tk)."""
         if response is None:
             return
 
         if response.status_code == 204: # 204 NO CONTENT = succès
+            if media_id in self._rows:
+                self.tree.delete(media_id)
+                del self._rows[media_id]
+            self._cache_remove(media_id)
             messagebox.showinfo("Succès", "Média supprimé avec succès.")
             self.load_media(reset_category=True) # Recharger la liste et réinitialiser la catégorie
 
@@ -193,49 +487,97 @@ class LibraryApp:
         # L'ID est dans la première colonne de l'élément sélectionné
         media_id = self.tree.item(selected_items[0], 'values')[0]
 
-        response = self._safe_request('GET', f"/media/{media_id}")
-        
+        if media_id in self._cache:
+            # Détails déjà connus: affichés sans requête
+            self._show_details(media_id, self._cache[media_id])
+            return
+        self.request_async('GET', f"/media/{media_id}", lambda response: self._on_media_details(media_id, response))
+
+    def _on_media_details(self, media_id, response):
+        """Affiche les détails reçus (thread Tk)."""
         if response is None:
             return
 
         if response.status_code == 200:
-            media = response.json()
-            details = (
-                f"ID: {media.get('id', 'N/A')}\n"
-                f"Nom: {media.get('name', 'N/A')}\n"
-                f"Auteur / Réalisateur: {media.get('author', 'N/A')}\n"
-                f"Catégorie: {media.get('category', 'N/A')}\n"
-                f"Date de Publication: {media.get('publication_date', 'N/A')}\n"
-                f"Date de Création: {media.get('creation_date', 'N/A')}" 
-            )
-            messagebox.showinfo(f"Détails du Média ID {media_id}", details)
+            self._show_details(media_id, response.json())
+
+    def _show_details(self, media_id, media):
+        """Affiche les métadonnées d'un média dans une boîte de dialogue."""
+        details = (
+            f"ID: {media.get('id', 'N/A')}\n"
+            f"Nom: {media.get('name', 'N/A')}\n"
+            f"Auteur / Réalisateur: {media.get('author', 'N/A')}\n"
+            f"Catégorie: {media.get('category', 'N/A')}\n"
+            f"Date de Publication: {media.get('publication_date', 'N/A')}\n"
+            f"Date de Création: {media.get('creation_date', 'N/A')}" 
+        )
+        messagebox.showinfo(f"Détails du Média ID {media_id}", details)
 
     # --- Fonctions d'Interface ---
 
-    def update_treeview(self, media_list):
-        """Met à jour le contenu de la table (Treeview). (Optimisé pour la réactivité)"""
-        # Efface les lignes existantes
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        # Insère les nouvelles lignes
-        for media in media_list:
-            self.tree.insert('', 'end', values=(
-                media.get('id', 'N/A'),
-                media.get('name', ''),
-                media.get('author', ''),
-                media.get('publication_date', ''),
-                media.get('category', '')
-            ))
+    @staticmethod
+    def _row_values(media):
+        return (
+            str(media.get('id', 'N/A')),
+            media.get('name', ''),
+            media.get('author', ''),
+            media.get('publication_date', ''),
+            media.get('category', '')
+        )
+
+    def update_treeview(self, media_list, after=None, until=None):
+        """
+        Met à jour le contenu de la table (Treeview) par différence avec les lignes affichées:
+        seules les lignes ajoutées, modifiées ou supprimées sont touchées (l'ID sert d'identifiant de ligne).
+        `after`/`until` limitent la mise à jour aux lignes dont l'ID est dans ]after, until]
+        (une page de la liste triée par ID); par défaut, toute la table est remplacée par `media_list`.
+        """
+        children = list(self.tree.get_children())
+        start, end = 0, len(children)
+        if after is not None or until is not None:
+            keys = [id_sort_key(iid) for iid in children]
+            if after is not None:
+                start = bisect_right(keys, id_sort_key(after))
+            if until is not None:
+                end = bisect_right(keys, id_sort_key(until))
+
+        # Supprime les lignes de la plage qui ne sont plus dans la liste
+        wanted = {str(media.get('id', 'N/A')) for media in media_list}
+        stale = [iid for iid in children[start:end] if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                self._rows.pop(iid, None)
+        window = [iid for iid in children[start:end] if iid in wanted]
+
+        # Insère, déplace ou met à jour les lignes dans l'ordre de la liste
+        for offset, media in enumerate(media_list):
+            values = self._row_values(media)
+            iid = values[0]
+            if offset < len(window) and window[offset] == iid:
+                if self._rows.get(iid) != values:
+                    self.tree.item(iid, values=values)
+            elif iid in self._rows:
+                self.tree.move(iid, '', start + offset)
+                self.tree.item(iid, values=values)
+                if iid in window:
+                    window.remove(iid)
+                window.insert(offset, iid)
+            else:
+                self.tree.insert('', start + offset, iid=iid, values=values)
+                window.insert(offset, iid)
+            self._rows[iid] = values
 
     def open_create_window(self):
         """Ouvre une nouvelle fenêtre pour la création de médias."""
-        CreateMediaWindow(self.master, self.load_media)
+        CreateMediaWindow(self.master, self.load_media, self.request_async)
 
 
 class CreateMediaWindow:
-    def __init__(self, master, callback):
+    def __init__(self, master, callback, request_async):
         self.callback = callback
+        # Envoi en arrière-plan via le client principal (session et indicateur de chargement partagés)
+        self.request_async = request_async
         self.top = tk.Toplevel(master)
         self.top.title("Créer un Nouveau Média")
         self.top.geometry("400x300")
@@ -280,7 +622,8 @@ class CreateMediaWindow:
         
         category_menu.set(creation_categories[0]) 
 
-        ttk.Button(self.top, text="Créer", command=self.submit_media).pack(pady=10)
+        self.submit_button = ttk.Button(self.top, text="Créer", command=self.submit_media)
+        self.submit_button.pack(pady=10)
 
     def submit_media(self):
         """Envoie la nouvelle donnée via POST à l'API."""
@@ -298,30 +641,26 @@ class CreateMediaWindow:
             messagebox.showwarning("Erreur de Validation", "Tous les champs doivent être remplis.")
             return
 
-        try:
-            # IMPORTANT: Le paramètre json=data dans requests.post gère la sérialisation en JSON
-            response = requests.post(f"{API_BASE_URL}/media", json=data) 
-        except requests.exceptions.ConnectionError:
-            messagebox.showerror("Erreur de Connexion", "Impossible de se connecter au serveur Flask.")
+        # IMPORTANT: Le paramètre json=data dans requests gère la sérialisation en JSON
+        self.submit_button.state(['disabled'])
+        self.request_async('POST', "/media", lambda response: self._on_created(data, response), json=data)
+
+    def _on_created(self, data, response):
+        """Traite la réponse de création (thread Tk)."""
+        if not self.top.winfo_exists():
             return
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Une erreur inattendue s'est produite: {e}")
+        self.submit_button.state(['!disabled'])
+        if response is None:
+            # Erreur déjà signalée (connexion ou API)
             return
-        
+
         if response.status_code == 201: # 201 CREATED
             messagebox.showinfo("Succès", f"Média '{data['name']}' créé avec succès!")
             self.top.destroy()
             # Appel de la callback pour recharger la liste (avec reset_category=True)
             self.callback(reset_category=True) 
-        elif 400 <= response.status_code < 500: 
-            try:
-                error_details = response.json().get('error', 'Erreur inconnue')
-            except json.JSONDecodeError:
-                error_details = response.text or 'Réponse de serveur invalide.'
-
-            messagebox.showerror(f"Échec de la Création ({response.status_code})", f"Erreur: {error_details}")
         else:
-            # Gère les erreurs serveur (500)
+            # Les erreurs 4xx/5xx sont signalées par _check_response; reste un statut inattendu
             messagebox.showerror("Erreur Serveur", f"Échec de la création. Statut: {response.status_code}")
 
 
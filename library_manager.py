@@ -1,50 +1,298 @@
-import json
 import os
-from datetime import datetime
+import threading
 import uuid
+from collections import deque
+from datetime import datetime
+from storage import CommitCoordinator, IdAllocator, StorageError, create_storage
+from rwlock import ReadWriteLock
+import metrics
+import serializers
+from media_record import MediaRecord
+from media_indexes import (CategoryIndex, FullTextIndex, IdOrderIndex, NameIndex, PrefixIndex,
+                           PublicationDateIndex, StatsIndex, parse_date)
 
 # Configuration des chemins d'accès
 DATA_DIR = 'data'
 # Utilise media_data.json (le typo "meida_data.json" a été corrigé ici)
 DATA_FILE = os.path.join(DATA_DIR, 'media_data.json') 
+# Mode de stockage par défaut: 'json' (réécriture complète), 'journal' (append-only),
+# 'binary' (journal + snapshot binaire, chargement en arrière-plan) ou 'sqlite' (multi-processus)
+DEFAULT_STORAGE_MODE = os.environ.get('LIBRARY_STORAGE_MODE', 'json')
+# Politique de durabilité par défaut: 'fsync', 'group' ou 'async'
+DEFAULT_DURABILITY = os.environ.get('LIBRARY_DURABILITY', 'fsync')
+# Champs d'un média (hors ID)
+MEDIA_FIELDS = ("name", "author", "publication_date", "category", "creation_date")
+# Champs obligatoires à la création d'un média
+REQUIRED_FIELDS = ("name", "author", "publication_date", "category")
+# Nombre de mutations conservées dans le journal des changements (flux GET /media/changes)
+CHANGE_LOG_SIZE = 10000
+# Garde en mémoire l'encodage JSON de chaque média servi (désactivable: LIBRARY_ENCODED_CACHE=0)
+DEFAULT_ENCODED_CACHE = os.environ.get('LIBRARY_ENCODED_CACHE', '1').lower() not in ('0', 'false', 'no', 'off')
 
 class LibraryManager:
     """
     Gère la lecture, l'écriture et la manipulation des données de la librairie.
-    Les données sont stockées en mémoire sous forme de dictionnaire {ID: media_object} 
+    Les données sont stockées en mémoire sous forme de dictionnaire {ID: MediaRecord} 
     pour une recherche et suppression O(1).
+    La persistance est déléguée à un backend de `storage` (voir `storage_mode`).
     """
 
-    def __init__(self):
+    # Chemins d'accès (attributs de classe pour pouvoir les rediriger, ex: tests)
+    DATA_DIR = DATA_DIR
+    DATA_FILE = DATA_FILE
+
+    def __init__(self, storage_mode=None, durability=None, group_commit_ms=5, group_commit_size=64,
+                 encoded_cache=None, **storage_options):
         # Assure l'existence du répertoire de données.
         # Comme vous avez confirmé que 'data' existe, cette ligne est une sécurité.
-        os.makedirs(DATA_DIR, exist_ok=True)
+        os.makedirs(self.DATA_DIR, exist_ok=True)
         self.categories_allowed = ["Book", "Film", "Magazine"]
-        self.media_data = self._load_data()
-        self._ensure_initial_data()
+        # Protège media_data, les index et les écritures en attente du stockage:
+        # les lectures s'exécutent en parallèle, les écritures une par une
+        self._lock = ReadWriteLock()
+        # Version des données: incrémentée à chaque mutation (sert de validateur de cache/ETag)
+        self._version = 0
+        # Époque: identifie ce démarrage (et ce processus). La version repart de zéro à chaque
+        # démarrage, donc un jeton de synchronisation n'a de sens qu'avec son époque (voir change_token)
+        self._epoch = uuid.uuid4().hex[:12]
+        # Journal des changements récents: (version, ID) par mutation, de la plus ancienne à la plus récente.
+        # Couvre toutes les mutations postérieures à `_change_log_start`
+        self._change_log = deque()
+        self._change_log_start = 0
+        # Abonnés aux mutations (ex: flux d'événements du serveur), appelés par _publish
+        self._listeners = []
+        # Encodage JSON (bytes) des médias, par ID: encodé à l'écriture, ou à la première lecture
+        # pour les médias chargés au démarrage. Les listes de l'API deviennent une concaténation.
+        self._encoded_cache = DEFAULT_ENCODED_CACHE if encoded_cache is None else encoded_cache
+        self._encoded = {}
+        # Index secondaires, tenus à jour par add_media, delete_media et le chargement
+        self._id_order_index = IdOrderIndex()
+        self._category_index = CategoryIndex()
+        self._name_index = NameIndex()
+        self._prefix_index = PrefixIndex()
+        self._fulltext_index = FullTextIndex()
+        self._publication_date_index = PublicationDateIndex()
+        self._stats_index = StatsIndex()
+        self._indexes = [self._id_order_index, self._category_index, self._name_index, self._prefix_index,
+                         self._fulltext_index, self._publication_date_index, self._stats_index]
+        self._storage = create_storage(storage_mode or DEFAULT_STORAGE_MODE, self.DATA_FILE, **storage_options)
+        self._id_allocator = IdAllocator(self._storage)
+        self._committer = CommitCoordinator(
+            self._storage, self._lock, lambda: self.media_data,
+            policy=durability or DEFAULT_DURABILITY,
+            group_commit_ms=group_commit_ms,
+            group_commit_size=group_commit_size
+        )
+        # Chargement: immédiat, ou en arrière-plan si le stockage sait lire un média par ID
+        # directement sur disque (snapshot binaire). Les lectures par ID sont alors servies
+        # tout de suite; les autres opérations attendent la fin du chargement.
+        self._loaded = threading.Event()
+        self._load_error = None
+        self._media_data = {}
+        self._startup_reader = self._storage.open_reader()
+        if self._startup_reader is None:
+            self._finish_loading()
+        else:
+            threading.Thread(target=self._finish_loading, name='library-loader', daemon=True).start()
 
+    @metrics.timed(metrics.PERSISTENCE_SECONDS, 'load')
     def _load_data(self):
-        """Charge les données depuis le fichier JSON."""
-        if os.path.exists(DATA_FILE) and os.path.getsize(DATA_FILE) > 0:
-            try:
-                with open(DATA_FILE, 'r') as f:
-                    # Charge le dictionnaire {ID: media_object}
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print(f"Error: JSON file '{DATA_FILE}' is corrupted. Starting with empty data.")
-                return {}
-            except Exception as e:
-                print(f"Error reading file '{DATA_FILE}': {e}. Starting with empty data.")
-                return {}
-        return {}
+        """Charge les données depuis le stockage (snapshot JSON + rejeu du journal le cas échéant)."""
+        # Charge le dictionnaire {ID: media_object}
+        return self._storage.load()
 
-    def _save_data(self):
-        """Sauvegarde les données actuelles dans le fichier JSON."""
+    def _finish_loading(self):
+        """Charge le catalogue complet et construit les index (au démarrage, éventuellement en arrière-plan)."""
         try:
-            with open(DATA_FILE, 'w') as f:
-                json.dump(self.media_data, f, indent=4)
+            self.media_data = self._load_data()
         except Exception as e:
-            print(f"FATAL ERROR: Could not write data to '{DATA_FILE}': {e}")
+            # Ne jamais servir (ni réécrire) un catalogue vide à la place des données illisibles
+            self._load_error = e
+            print(f"FATAL ERROR: Could not load data: {e}")
+            raise
+        finally:
+            self._startup_reader = None
+            self._loaded.set()
+        self._ensure_initial_data()
+
+    def _wait_until_loaded(self):
+        """Attend la fin du chargement initial. Lève StorageError s'il a échoué."""
+        self._loaded.wait()
+        if self._load_error is not None:
+            raise StorageError(f"Data could not be loaded: {self._load_error}")
+
+    @property
+    def is_loaded(self):
+        """True une fois le catalogue complet chargé et indexé."""
+        return self._loaded.is_set()
+
+    @property
+    def media_data(self):
+        """Dictionnaire {ID: MediaRecord} des données en mémoire."""
+        if not self._loaded.is_set():
+            self._wait_until_loaded()
+        return self._media_data
+
+    @media_data.setter
+    def media_data(self, media_data):
+        # Remplacer les données impose de reconstruire tous les index
+        with self._lock.write_lock:
+            self._media_data = {media_id: MediaRecord.from_mapping(media) for media_id, media in media_data.items()}
+            self._encoded = {}
+            self._rebuild_indexes()
+            self._version += 1
+            # Remplacement complet: les changements antérieurs ne décrivent plus les données
+            self._change_log.clear()
+            self._change_log_start = self._version
+
+    @property
+    def data_version(self):
+        """Numéro de version des données, incrémenté à chaque mutation (y compris venant d'autres processus)."""
+        self._sync_external_changes()
+        return self._version
+
+    @property
+    def change_token(self):
+        """Jeton de la version courante pour get_changes et le flux d'événements: "<époque>:<version>"."""
+        return self.format_change_token(self.data_version)
+
+    def format_change_token(self, version):
+        return f"{self._epoch}:{version}"
+
+    def parse_change_token(self, token):
+        """
+        Lit un jeton "<époque>:<version>". Retourne la version, ou None si le jeton vient d'un autre
+        démarrage ou d'un autre processus (ou vaut "0": aucun état connu). Lève ValueError s'il est mal formé.
+        """
+        epoch, separator, version = str(token).rpartition(':')
+        if not version.isdigit() or (separator and not epoch):
+            raise ValueError(f"Invalid version token: {token!r}. Expected '<epoch>:<version>'")
+        if epoch != self._epoch:
+            return None
+        return int(version)
+
+    @metrics.timed(metrics.INDEX_SECONDS, 'rebuild')
+    def _rebuild_indexes(self):
+        """Reconstruit tous les index à partir de media_data (chargement initial)."""
+        items = self._media_data.items()
+        # Les index triés se reconstruisent en bloc (un tri), les autres média par média
+        incremental = []
+        for index in self._indexes:
+            if hasattr(index, 'rebuild'):
+                index.rebuild(items)
+            else:
+                index.clear()
+                incremental.append(index)
+        max_numeric_id = 0
+        for media_id, media in items:
+            for index in incremental:
+                index.add(media_id, media)
+            if media_id.isdigit():
+                max_numeric_id = max(max_numeric_id, int(media_id))
+        # Les nouveaux IDs ne doivent jamais entrer en collision avec les données chargées
+        self._id_allocator.observe(max_numeric_id + 1)
+
+    def _sync_external_changes(self):
+        """
+        Intègre les écritures faites par d'autres processus (stockage partagé, ex: SQLite).
+        Coût quasi nul quand rien n'a changé; sinon, applique les changements sous le verrou en écriture.
+        Appelée avant chaque section verrouillée: attend aussi la fin du chargement initial.
+        """
+        if not self._loaded.is_set():
+            self._wait_until_loaded()
+        if not self._storage.changed_externally():
+            return
+        with self._lock.write_lock:
+            changes = self._storage.poll_changes()
+            if changes is None:
+                # Trop de retard: rechargement complet, en gardant les écritures locales pas encore en base
+                fresh_data = self._storage.load()
+                for media_id in self._storage.locally_pending_ids():
+                    if media_id in self._media_data:
+                        fresh_data[media_id] = self._media_data[media_id]
+                    else:
+                        fresh_data.pop(media_id, None)
+                self.media_data = fresh_data
+                return
+            for media_id, media in changes:
+                self._apply_remove(media_id)
+                if media is not None:
+                    self._apply_add(media_id, media)
+
+    def _apply_add(self, media_id, media):
+        """
+        Ajoute un média en mémoire et dans les index (sous le verrou en écriture, sans journaliser).
+        Les index sont mis à jour d'abord: si l'un d'eux échoue, rien n'est ajouté.
+        """
+        media = MediaRecord.from_mapping(media)
+        encoded = serializers.encode_media(media_id, media) if self._encoded_cache else None
+        self._index_add(media_id, media)
+        self._media_data[media_id] = media
+        if encoded is not None:
+            self._encoded[media_id] = encoded
+        self._version += 1
+        self._record_change(media_id)
+
+    def _apply_remove(self, media_id):
+        """Retire un média de la mémoire et des index. Retourne le média retiré, ou None."""
+        removed = self._media_data.pop(media_id, None)
+        self._encoded.pop(media_id, None)
+        if removed is not None:
+            self._index_remove(media_id, removed)
+            self._version += 1
+            self._record_change(media_id)
+        return removed
+
+    def _record_change(self, media_id):
+        """Note la mutation de `media_id` à la version courante (journal borné à CHANGE_LOG_SIZE)."""
+        if len(self._change_log) >= CHANGE_LOG_SIZE:
+            # La mutation la plus ancienne est oubliée: le journal ne couvre plus sa version
+            self._change_log_start = self._change_log.popleft()[0]
+        self._change_log.append((self._version, media_id))
+
+    def add_listener(self, listener):
+        """
+        Abonne `listener(event_id, event)` aux ajouts et suppressions faits par ce Manager.
+        `event` vaut {"op": "add", "media": {...}} ou {"op": "delete", "id": ID} (format du flux
+        de changements) et `event_id` est la version des données après la mutation.
+        Le listener est appelé sous le verrou en écriture: il ne doit pas bloquer.
+        """
+        self._listeners.append(listener)
+
+    def _publish(self, event):
+        for listener in self._listeners:
+            listener(self._version, event)
+
+    @metrics.timed(metrics.INDEX_SECONDS, 'add')
+    def _index_add(self, media_id, media):
+        """Ajoute le média à tous les index; en cas d'échec, le retire de ceux déjà mis à jour."""
+        updated = []
+        try:
+            for index in self._indexes:
+                index.add(media_id, media)
+                updated.append(index)
+        except Exception:
+            for index in reversed(updated):
+                index.remove(media_id, media)
+            raise
+
+    @metrics.timed(metrics.INDEX_SECONDS, 'remove')
+    def _index_remove(self, media_id, media):
+        for index in self._indexes:
+            index.remove(media_id, media)
+
+    @metrics.timed(metrics.PERSISTENCE_SECONDS, 'snapshot')
+    def _save_data(self):
+        """Sauvegarde un snapshot complet des données actuelles (compacte le journal)."""
+        self._committer.snapshot()
+
+    def close(self):
+        """Vide les écritures en attente. À appeler à l'arrêt du serveur."""
+        self._committer.close()
+
+    def get_persistence_stats(self):
+        """Retourne les compteurs de durabilité (flushs, mutations absorbées par flush) et l'état du chargement."""
+        return {**self._committer.stats(), "loaded": self.is_loaded}
 
     def _ensure_initial_data(self):
         """S'assure qu'il y a des données de base si le fichier était vide."""
@@ -67,72 +315,332 @@ class LibraryManager:
             
             self._save_data() # Sauvegarde après l'ajout des exemples
 
-    def get_all_media(self):
-        """Retourne la liste complète des médias, incluant l'ID comme champ."""
+    @metrics.timed(metrics.SERIALIZATION_SECONDS, 'media_list')
+    def _as_dicts(self, records):
+        """Convertit des couples (ID, MediaRecord) en objets de l'API (avec leur ID)."""
+        return [media.as_dict(media_id) for media_id, media in records]
+
+    @metrics.timed(metrics.SERIALIZATION_SECONDS, 'media_list_encoded')
+    def _as_encoded(self, records):
+        """
+        Comme _as_dicts, mais retourne chaque média encodé en JSON (bytes, voir serializers.join_array).
+        À appeler sous le verrou: un encodage mis en cache ne doit pas croiser une écriture du même média.
+        """
+        if not self._encoded_cache:
+            return [serializers.encode_media(media_id, media) for media_id, media in records]
+        encoded = self._encoded
+        result = []
+        for media_id, media in records:
+            data = encoded.get(media_id)
+            if data is None:
+                data = encoded[media_id] = serializers.encode_media(media_id, media)
+            result.append(data)
+        return result
+
+    def _convert(self, records, encoded):
+        return self._as_encoded(records) if encoded else self._as_dicts(records)
+
+    def get_all_media(self, encoded=False):
+        """
+        Retourne la liste complète des médias, incluant l'ID comme champ.
+        Avec `encoded`, chaque média est déjà encodé en JSON (bytes); de même pour les autres listes.
+        """
         # Convertit le dictionnaire {ID: media} en liste de [media avec ID] pour l'API
-        return [{"id": k, **v} for k, v in self.media_data.items()]
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            return self._convert(self.media_data.items(), encoded)
 
     def get_media_by_id(self, media_id):
         """Retourne un média par ID (recherche O(1)), ou None s'il n'est pas trouvé."""
-        media = self.media_data.get(str(media_id))
+        reader = self._startup_reader
+        if reader is not None and not self._loaded.is_set():
+            # Chargement en cours: lecture directe dans le snapshot sur disque
+            media = reader.get(str(media_id))
+            return {"id": str(media_id), **media} if media else None
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            media = self.media_data.get(str(media_id))
         if media:
-            return {"id": str(media_id), **media}
+            return media.as_dict(str(media_id))
         return None
 
-    def get_media_by_category(self, category):
-        """Retourne les médias filtrés par catégorie."""
-        all_media_list = self.get_all_media()
-        return [media for media in all_media_list if media.get('category') == category]
+    def get_media_batch(self, media_ids):
+        """Retourne (médias_trouvés, IDs_manquants) pour une liste d'IDs, dans l'ordre demandé."""
+        found, missing = [], []
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            for media_id in dict.fromkeys(str(media_id) for media_id in media_ids):
+                media = self.media_data.get(media_id)
+                if media is None:
+                    missing.append(media_id)
+                else:
+                    found.append(media.as_dict(media_id))
+        return found, missing
+
+    def get_media_by_category(self, category, encoded=False):
+        """Retourne les médias filtrés par catégorie (via l'index: ne touche que les médias concernés)."""
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            media_data = self.media_data
+            return self._convert(
+                ((media_id, media_data[media_id]) for media_id in self._category_index.ids(category)), encoded)
+
+    def list_media(self, category=None, limit=None, cursor=None, encoded=False):
+        """
+        Retourne une page de médias triés par ID: (liste, curseur_suivant).
+        `cursor` est l'ID du dernier média de la page précédente; le curseur suivant
+        vaut None à la dernière page. Filtre optionnel par catégorie.
+        """
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            records, next_cursor = self._page_locked(category, limit, cursor)
+            return self._convert(records, encoded), next_cursor
+
+    def _page_records(self, category, limit, cursor):
+        """Comme list_media, mais retourne les enregistrements stockés [(ID, MediaRecord)]."""
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            return self._page_locked(category, limit, cursor)
+
+    def _page_locked(self, category, limit, cursor):
+        ids = self._id_order_index.ids if category is None else self._category_index.ids(category)
+        page_ids, next_cursor = ids.page(after=cursor, limit=limit)
+        media_data = self.media_data
+        return [(media_id, media_data[media_id]) for media_id in page_ids], next_cursor
+
+    def list_media_by_publication_date(self, date_from=None, date_to=None, category=None, limit=None, cursor=None,
+                                       encoded=False):
+        """
+        Retourne les médias publiés entre `date_from` et `date_to` (incluses, "AAAA", "AAAA-MM"
+        ou "AAAA-MM-JJ"), triés par date de publication: (liste, curseur_suivant).
+        Filtre optionnel par catégorie. Lève ValueError si une borne est invalide.
+        """
+        date_from = parse_date(date_from, partial=True) if date_from is not None else None
+        date_to = parse_date(date_to, partial=True, end=True) if date_to is not None else None
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            page_ids, next_cursor = self._publication_date_index.range(
+                date_from, date_to, category=category, after=cursor, limit=limit
+            )
+            media_data = self.media_data
+            return self._convert(((media_id, media_data[media_id]) for media_id in page_ids), encoded), next_cursor
+
+    def get_category_counts(self):
+        """Retourne le nombre de médias par catégorie, sans parcourir le catalogue."""
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            return self._category_index.counts()
+
+    def get_changes(self, since):
+        """
+        Retourne les changements postérieurs au jeton de version `since` (voir change_token):
+        {"version": jeton, "reset": bool, "changes": [...]}, où chaque changement vaut
+        {"op": "add", "media": {...}} (état courant du média) ou {"op": "delete", "id": ID}.
+        Un média modifié plusieurs fois n'apparaît qu'une fois. Si `since` n'est plus couverte
+        par le journal (trop ancienne, ou jeton d'un autre démarrage du serveur), `reset` vaut
+        True et `changes` contient tout le catalogue: le client repart de zéro.
+        Lève ValueError si le jeton est mal formé.
+        """
+        since = self.parse_change_token(since)
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            media_data = self.media_data
+            token = self.format_change_token(self._version)
+            if since is None or since < self._change_log_start or since > self._version:
+                changes = [{"op": "add", "media": media.as_dict(media_id)}
+                           for media_id, media in media_data.items()]
+                return {"version": token, "reset": True, "changes": changes}
+            changed_ids = []
+            for version, media_id in reversed(self._change_log):
+                if version <= since:
+                    break
+                changed_ids.append(media_id)
+            changes = []
+            # Du plus ancien au plus récent, chaque ID à la position de sa dernière mutation
+            for media_id in reversed(list(dict.fromkeys(changed_ids))):
+                media = media_data.get(media_id)
+                if media is None:
+                    changes.append({"op": "delete", "id": media_id})
+                else:
+                    changes.append({"op": "add", "media": media.as_dict(media_id)})
+            return {"version": token, "reset": False, "changes": changes}
+
+    def get_media_stats(self, top=10, include_authors=False):
+        """
+        Retourne les agrégats du catalogue: total, par catégorie, par décennie de publication,
+        nombre d'auteurs et les `top` auteurs les plus représentés (`include_authors`: tous les auteurs).
+        Les agrégats sont tenus à jour à chaque mutation: aucune requête ne parcourt le catalogue.
+        """
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            return self._stats_index.snapshot(top=top, include_authors=include_authors)
+
+    def iter_media(self, category=None, since=None, batch_size=500, as_json=False):
+        """
+        Itère sur les médias par ID croissant, lot par lot (mémoire constante).
+        Chaque lot est une vue cohérente; le verrou est relâché entre deux lots
+        pour ne pas bloquer les écritures pendant un long export.
+        `since` ("AAAA-MM-JJ HH:MM:SS") ne garde que les médias créés à partir de cette date;
+        les médias historiques sans date de création sont alors exclus.
+        Avec `as_json`, chaque média est produit directement sous forme de texte JSON.
+        """
+        cursor = None
+        while True:
+            page, cursor = self._page_records(category, batch_size, cursor)
+            for media_id, media in page:
+                if since is None or (media.creation_date or '') >= since:
+                    yield media.to_json(media_id) if as_json else media.as_dict(media_id)
+            if cursor is None:
+                return
 
     def search_media_by_name(self, name):
-        """Recherche un média par nom exact (insensible à la casse)."""
-        name_lower = name.lower()
-        for media_id, media in self.media_data.items():
-            if media.get('name', '').lower() == name_lower:
-                return {"id": media_id, **media}
+        """Recherche un média par nom exact (insensible à la casse et aux accents, O(1) via l'index)."""
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            ids = self._name_index.ids(name)
+            if ids:
+                return self.media_data[ids[0]].as_dict(ids[0])
         return None
 
+    def search_media_by_prefix(self, prefix, limit=10, offset=0):
+        """Retourne au plus `limit` médias dont le nom ou un mot du nom commence par `prefix` (à partir de `offset`)."""
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            media_data = self.media_data
+            ids = self._prefix_index.search(prefix, offset + limit)[offset:]
+            return [media_data[media_id].as_dict(media_id) for media_id in ids]
+
+    def search_media_fulltext(self, query, operator='and', limit=20, offset=0):
+        """
+        Recherche plein texte dans le nom et l'auteur, classée par pertinence (BM25).
+        Chaque résultat porte un champ `score`. `offset` permet de paginer les résultats classés.
+        """
+        if operator not in ('and', 'or'):
+            raise ValueError(f"Invalid search operator: {operator}. Must be 'and' or 'or'")
+        self._sync_external_changes()
+        with self._lock.read_lock:
+            media_data = self.media_data
+            return [
+                {**media_data[media_id].as_dict(media_id), "score": round(score, 4)}
+                for media_id, score in self._fulltext_index.search(query, operator, offset + limit)[offset:]
+            ]
+
     def _get_next_id(self):
-        """Génère le prochain ID numérique séquentiel pour la démo."""
-        if not self.media_data:
-            return "1"
+        """Génère le prochain ID numérique séquentiel (O(1), jamais réutilisé, même après redémarrage)."""
+        return self._id_allocator.next_id()
+
+    def reserve_ids(self, count):
+        """Réserve un bloc de `count` IDs consécutifs pour un import en masse."""
+        self._sync_external_changes()
+        with self._lock.write_lock:
+            return self._id_allocator.reserve(count)
+
+
+    def _new_media_record(self, name, author, publication_date, category):
+        """Valide les champs d'un nouveau média et construit l'objet stocké. Lève ValueError."""
+        for field, value in zip(REQUIRED_FIELDS, (name, author, publication_date, category)):
+            if not isinstance(value, str):
+                raise ValueError(f"Field '{field}' must be a string.")
+        if category not in self.categories_allowed:
+            raise ValueError(f"Invalid category: {category}. Must be one of {self.categories_allowed}")
         try:
-            # Trouve le max ID numérique et ajoute 1
-            max_id = max(int(k) for k in self.media_data.keys() if k.isdigit())
-            return str(max_id + 1)
+            publication_date = parse_date(publication_date)
         except ValueError:
-            # Fallback à UUID si les IDs sont mélangés (plus robuste)
-            return str(uuid.uuid4())
-            
+            raise ValueError(f"Invalid publication_date: {publication_date!r}. Expected YYYY-MM-DD") from None
+
+        return MediaRecord(
+            name=name,
+            author=author,
+            publication_date=publication_date,
+            category=category,
+            creation_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
+
+    def validate_media_input(self, data):
+        """Valide un média reçu sous forme de dict (ex: une ligne d'import). Retourne l'objet à stocker."""
+        if not isinstance(data, dict):
+            raise ValueError("Media must be a JSON object.")
+        for field in REQUIRED_FIELDS:
+            if field not in data:
+                raise ValueError(f"Missing required field: {field}")
+        return self._new_media_record(data['name'], data['author'], data['publication_date'], data['category'])
+
+    def _insert(self, media_id, media):
+        """Insère un média en mémoire, dans les index et dans le journal (sous le verrou)."""
+        self._apply_add(media_id, media)
+        self._storage.log_add(media_id, media)
+        if self._listeners:
+            self._publish({"op": "add", "media": self._media_data[media_id].as_dict(media_id)})
+
     def add_media(self, name, author, publication_date, category):
         """Ajoute un nouveau média et le sauvegarde. Retourne le nouvel objet."""
-        
-        if category not in self.categories_allowed:
-            raise ValueError(f"Invalid category: {category}. Must be one of {self.categories_allowed}")
+        new_media_data = self._new_media_record(name, author, publication_date, category)
 
-        # Utilise un ID unique
-        media_id = self._get_next_id()
-        
-        new_media_data = {
-            "name": name,
-            "author": author,
-            "publication_date": publication_date,
-            "category": category,
-            "creation_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        self._sync_external_changes()
+        with self._lock.write_lock:
+            # Utilise un ID unique
+            media_id = self._get_next_id()
+            self._insert(media_id, new_media_data)
+            seq = self._committer.note_mutation()
+        # Attend la durabilité hors verrou pour que les écrivains concurrents soient regroupés
+        self._committer.wait_durable(seq)
         
-        self.media_data[media_id] = new_media_data
-        self._save_data()
-        
-        return {"id": media_id, **new_media_data}
+        return new_media_data.as_dict(media_id)
+
+    def add_media_bulk(self, rows):
+        """
+        Import en masse: valide toutes les lignes d'abord, réserve un bloc d'IDs,
+        insère les lignes valides puis les rend durables en un seul commit.
+        Retourne (médias_créés, erreurs) où chaque erreur vaut {"index": i, "error": message}.
+        """
+        valid_records, errors = [], []
+        for index, row in enumerate(rows):
+            try:
+                valid_records.append(self.validate_media_input(row))
+            except ValueError as e:
+                errors.append({"index": index, "error": str(e)})
+        if not valid_records:
+            return [], errors
+
+        self._sync_external_changes()
+        with self._lock.write_lock:
+            media_ids = self._id_allocator.reserve(len(valid_records))
+            for media_id, media in zip(media_ids, valid_records):
+                self._insert(media_id, media)
+            seq = self._committer.note_mutation(len(valid_records))
+        self._committer.wait_durable(seq)
+
+        return [media.as_dict(media_id) for media_id, media in zip(media_ids, valid_records)], errors
 
     def delete_media(self, media_id):
         """Supprime un média par ID. Retourne True si supprimé (O(1)), False sinon."""
         media_id_str = str(media_id)
-        if media_id_str in self.media_data:
-            del self.media_data[media_id_str]
-            self._save_data()
-            return True
-        return False
+        self._sync_external_changes()
+        with self._lock.write_lock:
+            if self._apply_remove(media_id_str) is None:
+                return False
+            self._storage.log_delete(media_id_str)
+            self._publish({"op": "delete", "id": media_id_str})
+            seq = self._committer.note_mutation()
+        self._committer.wait_durable(seq)
+        return True
+
+    def delete_media_batch(self, media_ids):
+        """Supprime plusieurs médias sous un seul verrou et un seul commit. Retourne (supprimés, manquants)."""
+        deleted, missing = [], []
+        self._sync_external_changes()
+        with self._lock.write_lock:
+            for media_id in dict.fromkeys(str(media_id) for media_id in media_ids):
+                if self._apply_remove(media_id) is None:
+                    missing.append(media_id)
+                    continue
+                self._storage.log_delete(media_id)
+                self._publish({"op": "delete", "id": media_id})
+                deleted.append(media_id)
+            if not deleted:
+                return deleted, missing
+            seq = self._committer.note_mutation(len(deleted))
+        self._committer.wait_durable(seq)
+        return deleted, missing
     # STATUT: V1.0 - Les classes de données Media, Book, Film et la logique de gestion sont implémentées.
     
\ No newline at end of file
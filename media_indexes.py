@@ -0,0 +1,526 @@
+"""
+Index secondaires maintenus en mémoire par LibraryManager.
+
+Chaque index implémente le même protocole:
+    add(media_id, media)     -- appelé après l'ajout d'un média
+    remove(media_id, media)  -- appelé après la suppression d'un média
+    clear()                  -- vide l'index (avant une reconstruction complète)
+et, pour les index triés, une reconstruction en bloc (un seul tri au lieu d'une insertion par média):
+    rebuild(items)           -- reconstruit l'index à partir des paires (ID, média)
+"""
+import calendar
+import math
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from functools import lru_cache
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_TOKEN_RE = re.compile(r'\w+')
+_DATE_RE = re.compile(r'^\s*(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?\s*$')
+
+
+def normalize_text(text):
+    """
+    Normalise un texte pour la recherche: sans accents, insensible à la casse,
+    espaces compactés. Ex: "  Le Seigneur des ANNEAUX " -> "le seigneur des anneaux".
+    Les valeurs historiques qui ne sont pas des chaînes (ex: "name": 1984) sont indexées sous leur texte.
+    """
+    if text is None:
+        text = ''
+    elif not isinstance(text, str):
+        text = str(text)
+    if not text.isascii():
+        # Le texte ASCII n'a ni accents ni formes de compatibilité: inutile de le décomposer
+        decomposed = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _WHITESPACE_RE.sub(' ', text.casefold()).strip()
+
+
+def tokenize(text):
+    """Découpe un texte normalisé en mots. Ex: "J.R.R. Tolkien" -> ["j", "r", "r", "tolkien"]."""
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def parse_date(text, partial=False, end=False):
+    """
+    Analyse une date "AAAA-MM-JJ" (mois et jour sur un ou deux chiffres, ex: "2025-12-7")
+    et la retourne au format canonique "AAAA-MM-JJ". Lève ValueError si elle est invalide.
+    Avec `partial`, accepte aussi "AAAA" et "AAAA-MM" (bornes d'intervalle): le premier jour
+    de la période, ou le dernier si `end` est vrai.
+    """
+    if not isinstance(text, str):
+        raise ValueError(f"Invalid date: {text!r}. Expected YYYY-MM-DD")
+    return _parse_date(text, partial, end)
+
+
+# Les mêmes dates reviennent très souvent (chargement, index): les analyses sont mémorisées
+@lru_cache(maxsize=1 << 16)
+def _parse_date(text, partial, end):
+    match = _DATE_RE.match(text)
+    if match is None or (not partial and match.group(3) is None):
+        raise ValueError(f"Invalid date: {text!r}. Expected YYYY-MM-DD")
+    year = int(match.group(1))
+    month = int(match.group(2) or (12 if end else 1))
+    try:
+        if match.group(3) is not None:
+            day = int(match.group(3))
+        else:
+            day = calendar.monthrange(year, month)[1] if end else 1
+        return date(year, month, day).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date: {text!r}. Expected YYYY-MM-DD") from None
+
+
+def id_sort_key(media_id):
+    """Clé de tri stable des IDs: numériques par valeur, puis les IDs historiques non numériques."""
+    if media_id.isdigit():
+        return (0, int(media_id), media_id)
+    return (1, 0, media_id)
+
+
+def _label(value):
+    """Clé de regroupement d'un champ: une valeur historique qui n'est pas une chaîne (ex: ["X"]) compte sous son texte."""
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+def _discard_sorted(entries, entry):
+    """Retire `entry` d'une liste triée si elle y figure (recherche par bisect)."""
+    position = bisect_left(entries, entry)
+    if position < len(entries) and entries[position] == entry:
+        del entries[position]
+
+
+class SortedIds:
+    """
+    Ensemble d'IDs trié par `id_sort_key`, pour une pagination par curseur en O(log n + k).
+    Les IDs étant alloués de façon croissante, un ajout se fait presque toujours en fin de liste.
+    """
+
+    def __init__(self):
+        self._keys = []
+
+    @classmethod
+    def from_ids(cls, media_ids):
+        """Construit l'ensemble en un seul tri (chargement)."""
+        sorted_ids = cls()
+        sorted_ids._keys = sorted(map(id_sort_key, media_ids))
+        return sorted_ids
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return (key[2] for key in self._keys)
+
+    def add(self, media_id):
+        key = id_sort_key(media_id)
+        if not self._keys or self._keys[-1] < key:
+            self._keys.append(key)
+        else:
+            insort(self._keys, key)
+
+    def discard(self, media_id):
+        key = id_sort_key(media_id)
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+
+    def page(self, after=None, limit=None):
+        """
+        Retourne (ids, dernier_id) pour les IDs strictement après `after` (curseur),
+        au plus `limit`. `dernier_id` vaut None s'il n'y a pas de page suivante.
+        """
+        start = bisect_right(self._keys, id_sort_key(after)) if after is not None else 0
+        end = len(self._keys) if limit is None else min(start + limit, len(self._keys))
+        ids = [key[2] for key in self._keys[start:end]]
+        has_more = end < len(self._keys)
+        return ids, (ids[-1] if has_more and ids else None)
+
+
+class IdOrderIndex:
+    """Index de tous les IDs dans un ordre stable (pagination de GET /media)."""
+
+    def __init__(self):
+        self.ids = SortedIds()
+
+    def add(self, media_id, media):
+        self.ids.add(media_id)
+
+    def remove(self, media_id, media):
+        self.ids.discard(media_id)
+
+    def clear(self):
+        self.ids = SortedIds()
+
+    def rebuild(self, items):
+        self.ids = SortedIds.from_ids(media_id for media_id, _ in items)
+
+
+class CategoryIndex:
+    """Index catégorie -> IDs, triés par ID pour permettre la pagination par catégorie."""
+
+    def __init__(self):
+        self._ids_by_category = {}
+
+    def add(self, media_id, media):
+        category = _label(media.get('category'))
+        self._ids_by_category.setdefault(category, SortedIds()).add(media_id)
+
+    def remove(self, media_id, media):
+        category = _label(media.get('category'))
+        ids = self._ids_by_category.get(category)
+        if ids is None:
+            return
+        ids.discard(media_id)
+        if not ids:
+            del self._ids_by_category[category]
+
+    def clear(self):
+        self._ids_by_category = {}
+
+    def rebuild(self, items):
+        ids_by_category = {}
+        for media_id, media in items:
+            ids_by_category.setdefault(_label(media.get('category')), []).append(media_id)
+        self._ids_by_category = {category: SortedIds.from_ids(ids) for category, ids in ids_by_category.items()}
+
+    def ids(self, category):
+        """Retourne l'ensemble trié des IDs d'une catégorie."""
+        return self._ids_by_category.get(category) or SortedIds()
+
+    def counts(self):
+        """Retourne le nombre de médias par catégorie (O(nombre de catégories))."""
+        return {category: len(ids) for category, ids in self._ids_by_category.items()}
+
+
+class PublicationDateIndex:
+    """
+    Index trié par date de publication puis par ID, global et par catégorie,
+    pour des requêtes d'intervalle en O(log n + k) déjà dans l'ordre chronologique.
+    Les médias historiques dont la date n'est pas analysable ne sont pas indexés.
+    """
+
+    # Borne supérieure à toute clé d'ID (voir id_sort_key) pour une date donnée
+    _AFTER_ALL_IDS = (2,)
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._entries = []
+        self._entries_by_category = {}
+
+    @staticmethod
+    def _entry(media_id, media):
+        try:
+            return (parse_date(media.get('publication_date')), id_sort_key(media_id))
+        except ValueError:
+            return None
+
+    def rebuild(self, items):
+        self.clear()
+        for media_id, media in items:
+            entry = self._entry(media_id, media)
+            if entry is not None:
+                self._entries.append(entry)
+                self._entries_by_category.setdefault(_label(media.get('category')), []).append(entry)
+        self._entries.sort()
+        for entries in self._entries_by_category.values():
+            entries.sort()
+
+    def add(self, media_id, media):
+        entry = self._entry(media_id, media)
+        if entry is None:
+            return
+        insort(self._entries, entry)
+        insort(self._entries_by_category.setdefault(_label(media.get('category')), []), entry)
+
+    def remove(self, media_id, media):
+        entry = self._entry(media_id, media)
+        if entry is None:
+            return
+        _discard_sorted(self._entries, entry)
+        entries = self._entries_by_category.get(_label(media.get('category')))
+        if entries is not None:
+            _discard_sorted(entries, entry)
+            if not entries:
+                del self._entries_by_category[_label(media.get('category'))]
+
+    def range(self, date_from=None, date_to=None, category=None, after=None, limit=None):
+        """
+        Retourne (ids, curseur_suivant) des médias publiés entre `date_from` et `date_to`
+        (dates canoniques incluses, None = non borné), triés par date puis par ID.
+        `after` est le curseur "date/ID" de la page précédente; le curseur suivant vaut None
+        à la dernière page.
+        """
+        entries = self._entries if category is None else self._entries_by_category.get(category, [])
+        start = bisect_left(entries, (date_from,)) if date_from is not None else 0
+        if after is not None:
+            after_date, _, after_id = after.partition('/')
+            start = max(start, bisect_right(entries, (after_date, id_sort_key(after_id))))
+        end = bisect_right(entries, (date_to, self._AFTER_ALL_IDS)) if date_to is not None else len(entries)
+        stop = end if limit is None else min(start + limit, end)
+        ids = [entry[1][2] for entry in entries[start:stop]]
+        if stop < end and ids:
+            last_date = entries[stop - 1][0]
+            return ids, f"{last_date}/{ids[-1]}"
+        return ids, None
+
+
+class StatsIndex:
+    """
+    Agrégats maintenus incrémentalement: nombre de médias par catégorie, par auteur
+    et par décennie de publication, plus un classement des auteurs.
+    Le classement est une liste triée de (-nombre, auteur): le top N est une tranche,
+    sans parcourir le catalogue ni trier à chaque requête.
+    """
+
+    UNKNOWN_DECADE = 'unknown'
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.total = 0
+        self._by_category = {}
+        self._by_author = {}
+        self._by_decade = {}
+        self._author_ranking = []
+
+    @classmethod
+    def _decade(cls, media):
+        try:
+            return parse_date(media.get('publication_date'))[:3] + '0s'
+        except ValueError:
+            return cls.UNKNOWN_DECADE
+
+    @staticmethod
+    def _bump(counts, key, delta):
+        count = counts.get(key, 0) + delta
+        if count > 0:
+            counts[key] = count
+        else:
+            counts.pop(key, None)
+        return count
+
+    def _bump_author(self, author, delta):
+        previous = self._by_author.get(author, 0)
+        if previous:
+            _discard_sorted(self._author_ranking, (-previous, author))
+        count = self._bump(self._by_author, author, delta)
+        if count > 0:
+            insort(self._author_ranking, (-count, author))
+
+    def add(self, media_id, media):
+        self.total += 1
+        self._bump(self._by_category, _label(media.get('category')), 1)
+        self._bump(self._by_decade, self._decade(media), 1)
+        self._bump_author(_label(media.get('author', '')), 1)
+
+    def rebuild(self, items):
+        self.clear()
+        for media_id, media in items:
+            self.total += 1
+            self._bump(self._by_category, _label(media.get('category')), 1)
+            self._bump(self._by_decade, self._decade(media), 1)
+            self._bump(self._by_author, _label(media.get('author', '')), 1)
+        self._author_ranking = sorted((-count, author) for author, count in self._by_author.items())
+
+    def remove(self, media_id, media):
+        self.total -= 1
+        self._bump(self._by_category, _label(media.get('category')), -1)
+        self._bump(self._by_decade, self._decade(media), -1)
+        self._bump_author(_label(media.get('author', '')), -1)
+
+    def top_authors(self, limit=10):
+        """Retourne les `limit` auteurs les plus représentés [(auteur, nombre)], à égalité par ordre alphabétique."""
+        return [(author, -count) for count, author in self._author_ranking[:limit]]
+
+    def snapshot(self, top=10, include_authors=False):
+        """Retourne une copie des agrégats (O(catégories + décennies + top), ou O(auteurs) avec `include_authors`)."""
+        stats = {
+            "total": self.total,
+            "by_category": dict(self._by_category),
+            "by_decade": dict(sorted(self._by_decade.items())),
+            "author_count": len(self._by_author),
+            "top_authors": [{"author": author, "count": count} for author, count in self.top_authors(top)],
+        }
+        if include_authors:
+            stats["by_author"] = dict(self._by_author)
+        return stats
+
+
+class NameIndex:
+    """Index nom normalisé -> IDs pour une recherche exacte en O(1)."""
+
+    def __init__(self):
+        self._ids_by_name = {}
+
+    def add(self, media_id, media):
+        key = normalize_text(media.get('name', ''))
+        self._ids_by_name.setdefault(key, {})[media_id] = None
+
+    def remove(self, media_id, media):
+        key = normalize_text(media.get('name', ''))
+        ids = self._ids_by_name.get(key)
+        if ids is None:
+            return
+        ids.pop(media_id, None)
+        if not ids:
+            del self._ids_by_name[key]
+
+    def clear(self):
+        self._ids_by_name = {}
+
+    def ids(self, name):
+        """Retourne les IDs dont le nom correspond exactement (après normalisation)."""
+        return list(self._ids_by_name.get(normalize_text(name), ()))
+
+
+class PrefixIndex:
+    """
+    Index trié pour l'autocomplétion (type-ahead).
+
+    Deux listes triées de tuples (clé normalisée, ID), interrogées par bisect:
+    les noms complets, et les suffixes commençant à chaque mot suivant
+    (pour que "seig" trouve "Le Seigneur des Anneaux").
+    Requête en O(log n + k); insertion/suppression en O(n) (décalage mémoire de la liste).
+    """
+
+    def __init__(self):
+        self._names = []
+        self._word_suffixes = []
+
+    @staticmethod
+    def _suffixes(name):
+        words = name.split(' ')
+        return [' '.join(words[i:]) for i in range(1, len(words))]
+
+    def add(self, media_id, media):
+        name = normalize_text(media.get('name', ''))
+        insort(self._names, (name, media_id))
+        for suffix in self._suffixes(name):
+            insort(self._word_suffixes, (suffix, media_id))
+
+    def rebuild(self, items):
+        self.clear()
+        for media_id, media in items:
+            name = normalize_text(media.get('name', ''))
+            self._names.append((name, media_id))
+            self._word_suffixes.extend((suffix, media_id) for suffix in self._suffixes(name))
+        self._names.sort()
+        self._word_suffixes.sort()
+
+    def remove(self, media_id, media):
+        name = normalize_text(media.get('name', ''))
+        _discard_sorted(self._names, (name, media_id))
+        for suffix in self._suffixes(name):
+            _discard_sorted(self._word_suffixes, (suffix, media_id))
+
+    def clear(self):
+        self._names = []
+        self._word_suffixes = []
+
+    def search(self, prefix, limit=10):
+        """
+        Retourne au plus `limit` IDs dont le nom (ou un mot du nom) commence par `prefix`.
+        Les correspondances en début de nom viennent en premier, puis par ordre alphabétique.
+        """
+        key = normalize_text(prefix)
+        if not key or limit <= 0:
+            return []
+        found = {}
+        for entries in (self._names, self._word_suffixes):
+            position = bisect_left(entries, (key, ''))
+            while position < len(entries) and len(found) < limit:
+                entry_key, media_id = entries[position]
+                if not entry_key.startswith(key):
+                    break
+                found.setdefault(media_id, None)
+                position += 1
+            if len(found) >= limit:
+                break
+        return list(found)
+
+
+class FullTextIndex:
+    """
+    Index inversé mot -> {ID: fréquence} sur les champs `name` et `author`,
+    avec un classement BM25.
+    """
+
+    FIELDS = ('name', 'author')
+    # Paramètres BM25 usuels
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._postings = {}
+        self._doc_lengths = {}
+        self._total_length = 0
+
+    def _terms(self, media):
+        terms = []
+        for field in self.FIELDS:
+            terms.extend(tokenize(media.get(field, '')))
+        return terms
+
+    def add(self, media_id, media):
+        terms = self._terms(media)
+        for term in terms:
+            postings = self._postings.setdefault(term, {})
+            postings[media_id] = postings.get(media_id, 0) + 1
+        self._doc_lengths[media_id] = len(terms)
+        self._total_length += len(terms)
+
+    def remove(self, media_id, media):
+        for term in set(self._terms(media)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(media_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(media_id, 0)
+
+    def search(self, query, operator='and', limit=20):
+        """
+        Retourne une liste [(ID, score)] triée par score décroissant.
+        operator='and': tous les mots doivent être présents; 'or': au moins un.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+        postings = [self._postings.get(term, {}) for term in terms]
+        if operator == 'and':
+            if not all(postings):
+                return []
+            # Part de la liste la plus courte pour limiter les intersections
+            candidates = set(min(postings, key=len))
+            for term_postings in postings:
+                candidates.intersection_update(term_postings)
+        else:
+            candidates = set()
+            for term_postings in postings:
+                candidates.update(term_postings)
+
+        doc_count = len(self._doc_lengths)
+        avg_length = (self._total_length / doc_count) if doc_count else 0.0
+        scores = {}
+        for term_postings in postings:
+            if not term_postings:
+                continue
+            idf = math.log(1 + (doc_count - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+            for media_id, frequency in term_postings.items():
+                if media_id not in candidates:
+                    continue
+                norm = self.K1 * (1 - self.B + self.B * self._doc_lengths[media_id] / avg_length)
+                scores[media_id] = scores.get(media_id, 0.0) + idf * frequency * (self.K1 + 1) / (frequency + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+# STATUT: V1.1 - Index secondaires: catégorie, nom normalisé, préfixe (autocomplétion), plein texte BM25.
@@ -0,0 +1,128 @@
+"""
+Représentation compacte d'un média en mémoire.
+
+Un dict par média coûte cher à des millions d'enregistrements (table de hachage,
+cinq clés, chaînes de dates dupliquées). `MediaRecord` range les champs dans des
+`__slots__` et partage les chaînes répétées (catégorie, auteur, date de publication)
+via `sys.intern`. Les dates restent des chaînes: relire un média ne coûte aucune conversion.
+
+Un MediaRecord reste en lecture seule et se comporte comme un Mapping:
+`record["name"]`, `record.get("category")`, `{**record}` et `dict(record)` fonctionnent.
+"""
+import json
+import sys
+from collections.abc import Mapping
+from datetime import date
+from functools import lru_cache
+from json.encoder import encode_basestring_ascii
+
+# Les mêmes dates reviennent très souvent: les analyses sont mémorisées
+_CONVERSION_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=_CONVERSION_CACHE_SIZE)
+def _parse_day(text):
+    """"AAAA-MM-JJ" canonique -> ordinal du jour, ou None."""
+    if len(text) == 10 and text[4] == '-' and text[7] == '-' and text[:4].isdigit():
+        try:
+            return date.fromisoformat(text).toordinal()
+        except ValueError:
+            return None
+    return None
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class MediaRecord(Mapping):
+    """
+    Média stocké (sans son ID). Les champs absents valent None et n'apparaissent pas
+    dans les clés (ex: médias historiques sans `creation_date`).
+    """
+
+    __slots__ = ('name', 'author', 'category', 'publication_date', 'creation_date')
+
+    FIELDS = ("name", "author", "publication_date", "category", "creation_date")
+
+    def __init__(self, name, author, publication_date, category, creation_date=None):
+        self.name = name
+        self.author = _intern(author)
+        self.category = _intern(category)
+        # Les dates restent des chaînes (lecture sans conversion); les dates de publication,
+        # très répétées, sont partagées entre médias
+        self.publication_date = _intern(publication_date)
+        self.creation_date = creation_date
+
+    @classmethod
+    def from_mapping(cls, media):
+        """Construit un MediaRecord depuis un dict (chargement, import); un MediaRecord est renvoyé tel quel."""
+        if isinstance(media, MediaRecord):
+            return media
+        return cls(media.get('name'), media.get('author'), media.get('publication_date'),
+                   media.get('category'), media.get('creation_date'))
+
+    @property
+    def publication_ordinal(self):
+        """Date de publication en ordinal du jour, ou None si elle n'est pas au format canonique."""
+        publication = self.publication_date
+        return _parse_day(publication) if isinstance(publication, str) else None
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        return iter(self.as_dict())
+
+    def __len__(self):
+        return len(self.as_dict())
+
+    def keys(self):
+        return self.as_dict().keys()
+
+    def items(self):
+        return self.as_dict().items()
+
+    def values(self):
+        return self.as_dict().values()
+
+    def __repr__(self):
+        return f"MediaRecord({self.as_dict()!r})"
+
+    def as_dict(self, media_id=None):
+        """Retourne le média sous forme de dict (précédé de son `id` si fourni), sans passer par le protocole Mapping."""
+        name, author, publication, category, creation = (
+            self.name, self.author, self.publication_date, self.category, self.creation_date)
+        if media_id is None:
+            fields = {"name": name, "author": author, "publication_date": publication,
+                      "category": category, "creation_date": creation}
+        else:
+            fields = {"id": media_id, "name": name, "author": author, "publication_date": publication,
+                      "category": category, "creation_date": creation}
+        if creation is None or name is None or author is None or publication is None or category is None:
+            return {field: value for field, value in fields.items() if value is not None}
+        return fields
+
+    def to_json(self, media_id=None):
+        """Sérialise directement le média en JSON (mêmes clés et valeurs que `as_dict`)."""
+        parts = [] if media_id is None else ['"id": ' + encode_basestring_ascii(media_id)]
+        for field, value in (("name", self.name), ("author", self.author),
+                             ("publication_date", self.publication_date), ("category", self.category),
+                             ("creation_date", self.creation_date)):
+            if type(value) is str:
+                parts.append(f'"{field}": {encode_basestring_ascii(value)}')
+            elif value is not None:
+                parts.append(f'"{field}": {json.dumps(value)}')
+        return '{' + ', '.join(parts) + '}'
+# STATUT: V1.1 - Enregistrements compacts (slots, chaînes partagées), dates gardées en chaînes.
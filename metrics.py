@@ -0,0 +1,209 @@
+"""
+Métriques du serveur au format texte Prometheus (exposées par GET /metrics).
+
+Désactivées avec LIBRARY_METRICS=0: `timed` renvoie alors la fonction d'origine telle quelle
+et le serveur n'installe pas ses hooks de requête, si bien que les chemins chauds ne paient rien.
+"""
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+ENABLED = os.environ.get('LIBRARY_METRICS', '1').lower() not in ('0', 'false', 'no', 'off')
+
+# Bornes des histogrammes de durée (secondes) et de taille (octets)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Compteur croissant, une série par combinaison de valeurs des labels."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labelvalues, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labelnames, labelvalues), value
+
+
+class _HistogramSeries:
+    """Une série d'histogramme (valeurs de labels fixées): compteurs par intervalle, somme, total."""
+
+    __slots__ = ('_buckets', '_counts', '_sum', '_lock')
+
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        position = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[position] += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes, une série par combinaison de valeurs des labels."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *labelvalues):
+        """Retourne la série de ces valeurs de labels (à garder pour les appels fréquents)."""
+        series = self._series.get(labelvalues)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labelvalues, _HistogramSeries(self.buckets))
+        return series
+
+    def observe(self, value, *labelvalues):
+        self.labels(*labelvalues).observe(value)
+
+    def samples(self):
+        with self._lock:
+            series = dict(self._series)
+        for labelvalues, one_series in sorted(series.items()):
+            counts, total = one_series.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield (self.name + '_bucket',
+                       _format_labels(self.labelnames, labelvalues, ('le', _format_value(bound))), cumulative)
+            yield self.name + '_sum', _format_labels(self.labelnames, labelvalues), total
+            yield self.name + '_count', _format_labels(self.labelnames, labelvalues), cumulative
+
+
+class CallbackMetric:
+    """
+    Valeur lue au moment de l'export: `read()` retourne un nombre, ou None (pas de valeur).
+    Sert aux jauges et aux compteurs déjà tenus ailleurs (ex: succès du cache de réponses).
+    """
+
+    def __init__(self, name, documentation, read, kind='gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self._read = read
+
+    def samples(self):
+        value = self._read()
+        if value is not None:
+            yield self.name, '', value
+
+
+class MetricsRegistry:
+    """Ensemble des métriques exportées."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, read):
+        return self._register(CallbackMetric(name, documentation, read))
+
+    def counter_callback(self, name, documentation, read):
+        return self._register(CallbackMetric(name, documentation, read, kind='counter'))
+
+    def render(self):
+        """Export au format texte Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Durées internes de LibraryManager et du stockage
+PERSISTENCE_SECONDS = REGISTRY.histogram(
+    'library_persistence_seconds', "Time spent loading and writing the catalog.", ('operation',))
+INDEX_SECONDS = REGISTRY.histogram(
+    'library_index_seconds', "Time spent maintaining the secondary indexes.", ('operation',))
+SERIALIZATION_SECONDS = REGISTRY.histogram(
+    'library_serialization_seconds', "Time spent converting stored media to API objects.", ('operation',))
+
+
+def timed(histogram, *labelvalues):
+    """
+    Décorateur: observe la durée de chaque appel dans `histogram` (série `labelvalues`).
+    Sans effet quand les métriques sont désactivées (la fonction est renvoyée inchangée).
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+        series = histogram.labels(*labelvalues)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+# STATUT: V1.0 - Métriques Prometheus (compteurs, histogrammes, jauges) désactivables.
@@ -0,0 +1,55 @@
+"""
+Importe le catalogue existant (data/media_data.json, plus le journal s'il existe)
+dans une base SQLite utilisable avec LIBRARY_STORAGE_MODE=sqlite.
+
+Utilisation:
+    python3 migrate_to_sqlite.py [--source data/media_data.json] [--target data/media_data.sqlite3] [--force]
+"""
+import argparse
+import os
+import sys
+
+from library_manager import DATA_FILE
+from storage import JournalStorage, SqliteStorage, read_json_file
+
+
+def migrate(source, target, force=False):
+    """Copie les médias de `source` vers la base `target`. Retourne le nombre de médias importés."""
+    if os.path.exists(target) and not force:
+        raise FileExistsError(f"Target database '{target}' already exists. Use --force to overwrite it.")
+
+    # JournalStorage lit le snapshot JSON et rejoue le journal éventuel
+    source_storage = JournalStorage(source)
+    media_data = source_storage.load()
+    source_storage.close()
+
+    target_storage = SqliteStorage(source, db_file=target)
+    target_storage.prepare_snapshot(media_data).write()
+    # Les nouveaux IDs doivent suivre les IDs importés et ceux déjà réservés par les modes fichier
+    numeric_ids = [int(media_id) for media_id in media_data if media_id.isdigit()]
+    reserved = read_json_file(source_storage.id_file).get('next_id', 1)
+    target_storage.reserve_id_block(max(max(numeric_ids, default=0) + 1, reserved), 0)
+    target_storage.close()
+    return len(media_data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import the JSON media catalog into SQLite.")
+    parser.add_argument('--source', default=DATA_FILE, help="JSON data file (default: %(default)s)")
+    parser.add_argument('--target', default=None, help="SQLite database (default: <source>.sqlite3)")
+    parser.add_argument('--force', action='store_true', help="Overwrite the target database if it exists")
+    args = parser.parse_args(argv)
+
+    target = args.target or os.path.splitext(args.source)[0] + '.sqlite3'
+    try:
+        count = migrate(args.source, target, force=args.force)
+    except FileExistsError as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"INFO: Imported {count} media from '{args.source}' into '{target}'.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+# STATUT: V1.1 - Outil de migration du catalogue JSON vers SQLite.
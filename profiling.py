@@ -0,0 +1,114 @@
+"""
+Profilage à la demande de requêtes individuelles (cProfile).
+
+Désactivé par défaut: il n'est actif que si LIBRARY_PROFILING_TOKEN est défini, et seules
+les requêtes qui présentent ce jeton sont profilées. Les derniers profils sont gardés en
+mémoire (tampon circulaire) pour être consultés ou téléchargés.
+"""
+import cProfile
+import hmac
+import io
+import itertools
+import marshal
+import os
+import pstats
+import threading
+import time
+from collections import OrderedDict
+
+# Jeton d'administration: sans lui, le profilage est complètement désactivé
+TOKEN = os.environ.get('LIBRARY_PROFILING_TOKEN') or None
+ENABLED = TOKEN is not None
+# Nombre de profils conservés
+DEFAULT_MAX_PROFILES = int(os.environ.get('LIBRARY_PROFILING_KEEP', 20))
+# Nombre de fonctions affichées dans le rapport texte
+REPORT_LINES = 40
+
+
+def token_matches(candidate):
+    """Compare un jeton reçu au jeton d'administration (en temps constant)."""
+    return ENABLED and candidate is not None and hmac.compare_digest(candidate.encode(), TOKEN.encode())
+
+
+class RequestProfile:
+    """Profil cProfile d'une requête, avec son contexte (méthode, chemin, statut, durée)."""
+
+    def __init__(self, profile_id, method, path, status, duration, profiler):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.status = status
+        self.duration = duration
+        self.created = time.time()
+        stats = pstats.Stats(profiler)
+        # Format de pstats.dump_stats: lisible par pstats, snakeviz, etc.
+        self.data = marshal.dumps(stats.stats)
+        self.total_calls = stats.total_calls
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration * 1000, 3),
+            "total_calls": self.total_calls,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created)),
+        }
+
+    def report(self, sort='cumulative', limit=REPORT_LINES):
+        """Rapport texte des `limit` fonctions les plus coûteuses (tri pstats: cumulative, tottime, calls...)."""
+        output = io.StringIO()
+        stats = pstats.Stats(_MarshalledStats(self.data), stream=output)
+        stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+class _MarshalledStats:
+    """Adaptateur: pstats.Stats accepte tout objet doté de `create_stats` et `stats`."""
+
+    def __init__(self, data):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+
+class ProfileStore:
+    """Tampon circulaire des derniers profils, indexés par ID."""
+
+    def __init__(self, max_profiles=DEFAULT_MAX_PROFILES):
+        self.max_profiles = max_profiles
+        self._profiles = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, method, path, status, duration, profiler):
+        """Enregistre le profil d'une requête terminée. Retourne son ID."""
+        with self._lock:
+            profile_id = next(self._ids)
+        profile = RequestProfile(profile_id, method, path, status, duration, profiler)
+        with self._lock:
+            self._profiles[profile_id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self):
+        """Résumés des profils conservés, du plus récent au plus ancien."""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [profile.summary() for profile in reversed(profiles)]
+
+
+def start():
+    """Démarre un profileur sur le thread courant. Retourne (profileur, instant de départ)."""
+    profiler = cProfile.Profile()
+    start_time = time.perf_counter()
+    profiler.enable()
+    return profiler, start_time
+# STATUT: V1.0 - Profilage cProfile par requête, sur jeton, avec tampon des derniers profils.
@@ -0,0 +1,80 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Taille mémoire maximale par défaut des réponses mises en cache (octets)
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class CachedResponse:
+    """Corps sérialisé d'une réponse de lecture, avec son ETag et ses en-têtes utiles."""
+
+    def __init__(self, body, mimetype, headers):
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = headers
+        self.etag = hashlib.sha1(body).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache LRU des réponses de lecture, indexé par (route, arguments) pour une version des données.
+
+    Dès que la version des données change, tout le cache est invalidé: une entrée n'est
+    jamais servie pour une autre version que celle qui l'a produite. La taille totale
+    des corps est bornée par `max_bytes` (les entrées les moins récemment utilisées sont évincées).
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._version = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._size = 0
+            self._version = version
+
+    def get(self, key, version):
+        """Retourne l'entrée en cache pour `key` à la version `version`, ou None."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, version, entry):
+        """Ajoute une entrée (ignorée si elle dépasse à elle seule la taille maximale)."""
+        with self._lock:
+            self._check_version(version)
+            if len(entry.body) > self.max_bytes:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def stats(self):
+        """Compteurs du cache (entrées, taille, succès, échecs)."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+# STATUT: V1.1 - Cache des réponses de lecture avec validation par ETag.
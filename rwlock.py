@@ -0,0 +1,86 @@
+import threading
+
+
+class _LockSide:
+    """Contexte `with` réutilisable pour un côté (lecture ou écriture) du verrou."""
+
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._release()
+        return False
+
+
+class ReadWriteLock:
+    """
+    Verrou lecteurs/rédacteur: plusieurs lecteurs en parallèle, un seul rédacteur à la fois.
+
+    - Priorité aux rédacteurs: un rédacteur en attente bloque les nouveaux lecteurs
+      (pas de famine des écritures sous charge de lecture).
+    - Réentrant: le thread rédacteur peut reprendre le verrou en écriture ou en lecture,
+      et un thread lecteur peut reprendre le verrou en lecture.
+
+    Utilisation:
+        with lock.read_lock: ...
+        with lock.write_lock: ...
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+        self.read_lock = _LockSide(self.acquire_read, self.release_read)
+        self.write_lock = _LockSide(self.acquire_write, self.release_write)
+
+    def _read_depth(self):
+        return getattr(self._local, 'depth', 0)
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        depth = self._read_depth()
+        with self._cond:
+            # Réentrance: déjà lecteur ou rédacteur, on n'attend pas (éviterait un interblocage)
+            if depth == 0 and self._writer != me:
+                self._cond.wait_for(lambda: self._writer is None and not self._waiting_writers)
+            self._readers += 1
+        self._local.depth = depth + 1
+
+    def release_read(self):
+        self._local.depth = self._read_depth() - 1
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if self._read_depth():
+                raise RuntimeError("Cannot upgrade a read lock to a write lock.")
+            self._waiting_writers += 1
+            try:
+                self._cond.wait_for(lambda: self._writer is None and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._cond.notify_all()
+# STATUT: V1.1 - Verrou lecteurs/rédacteur pour le service multi-thread.
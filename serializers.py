@@ -0,0 +1,56 @@
+"""
+Sérialisation JSON des réponses de l'API.
+
+Utilise orjson s'il est installé (nettement plus rapide), sinon le module json de la
+bibliothèque standard. LIBRARY_JSON_ENCODER=json force la bibliothèque standard.
+Les médias peuvent être encodés un par un (`encode_media`) puis assemblés en liste
+(`join_array`) sans réencoder: c'est ce que fait le cache d'encodage de LibraryManager.
+"""
+import json
+import os
+from collections.abc import Mapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if os.environ.get('LIBRARY_JSON_ENCODER', 'auto') == 'json':
+    orjson = None
+
+# Nom de l'encodeur utilisé ('orjson' ou 'json')
+ENCODER = 'json' if orjson is None else 'orjson'
+
+
+def _default(value):
+    """Types non natifs: les MediaRecord (et autres Mapping) sont encodés comme des dicts."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    """Encode `value` en JSON compact (bytes UTF-8)."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def loads(data):
+    """Décode un document JSON (str ou bytes). Lève ValueError s'il est invalide."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_media(media_id, media):
+    """Encode un MediaRecord tel que le renvoie l'API (avec son `id`)."""
+    if orjson is not None:
+        return orjson.dumps(media.as_dict(media_id))
+    return media.to_json(media_id).encode('utf-8')
+
+
+def join_array(encoded_items):
+    """Assemble des valeurs déjà encodées (bytes) en un tableau JSON."""
+    return b'[' + b','.join(encoded_items) + b']'
+# STATUT: V1.0 - Encodeur JSON interchangeable (orjson ou bibliothèque standard).
@@ -0,0 +1,863 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping
+
+import metrics
+from binary_snapshot import SnapshotReader, encode_snapshot
+
+# Nombre d'enregistrements du journal au-delà duquel on réécrit un snapshot complet
+DEFAULT_COMPACT_EVERY = 1000
+# Politiques de durabilité: fsync à chaque requête, commit groupé, ou flush asynchrone
+DURABILITY_POLICIES = ('fsync', 'group', 'async')
+
+
+class StorageError(IOError):
+    """Échec d'écriture: les mutations concernées ne sont pas durables."""
+
+
+def _fsync_directory(path):
+    """Force l'écriture de l'entrée de répertoire (nécessaire après un os.replace)."""
+    try:
+        fd = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        # Certains systèmes (Windows) n'autorisent pas l'ouverture d'un répertoire
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_text_atomic(path, text):
+    """
+    Écrit un fichier de façon atomique: fichier temporaire + fsync + os.replace.
+    Un crash pendant l'écriture laisse l'ancienne version intacte.
+    `text` peut aussi être des bytes (fichier binaire).
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb' if isinstance(text, bytes) else 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(os.path.dirname(path))
+
+
+def _json_default(value):
+    """Sérialise les médias stockés sous une forme compacte (Mapping, ex: MediaRecord) comme des objets JSON."""
+    if isinstance(value, Mapping):
+        return dict(value.items())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dump_snapshot(media_data):
+    """Sérialise le dictionnaire complet au format du fichier de données."""
+    return json.dumps(media_data, indent=4, default=_json_default)
+
+
+def read_json_file(path):
+    """Charge un fichier JSON. Retourne {} si le fichier est absent, vide ou corrompu."""
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            print(f"Error: JSON file '{path}' is corrupted. Starting with empty data.")
+            return {}
+        except Exception as e:
+            print(f"Error reading file '{path}': {e}. Starting with empty data.")
+            return {}
+    return {}
+
+
+def _id_file(data_file):
+    return os.path.splitext(data_file)[0] + '.ids'
+
+
+def reserve_id_block_in_file(id_file, floor, size):
+    """
+    Réserve `size` IDs consécutifs en persistant la borne haute dans `id_file`.
+    Retourne le premier ID du bloc (jamais inférieur à `floor`).
+    """
+    meta = read_json_file(id_file)
+    start = max(int(meta.get('next_id', 1)), floor)
+    write_text_atomic(id_file, json.dumps({"next_id": start + size}))
+    return start
+
+
+class PendingWrite:
+    """
+    Écriture préparée (données déjà sérialisées) à rendre durable.
+    `prepare_commit` la construit sous le verrou des données; `write` s'exécute hors verrou.
+    """
+
+    def __init__(self, write_func, records, restore_func=None):
+        self._write_func = write_func
+        # Remet les mutations en attente si l'écriture échoue (appelé sous le verrou des données)
+        self._restore_func = restore_func
+        # Nombre de mutations absorbées par cette écriture
+        self.records = records
+
+    @metrics.timed(metrics.PERSISTENCE_SECONDS, 'write')
+    def write(self):
+        """Rend l'écriture durable. Lève StorageError en cas d'échec."""
+        self._write_func()
+
+    def restore(self):
+        """Remet en attente les mutations de cette écriture pour le prochain flush."""
+        if self._restore_func is not None:
+            self._restore_func()
+
+
+class JsonFileStorage:
+    """
+    Stockage historique: le dictionnaire complet est réécrit dans le fichier JSON
+    à chaque commit. Simple, mais le coût d'écriture croît avec la taille du catalogue.
+    """
+
+    name = 'json'
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.id_file = _id_file(data_file)
+        self._pending_records = 0
+
+    def reserve_id_block(self, floor, size):
+        """Réserve un bloc d'IDs dans le fichier `<data>.ids` (voir IdAllocator)."""
+        return reserve_id_block_in_file(self.id_file, floor, size)
+
+    def load(self):
+        """Retourne le dictionnaire {ID: media_object} stocké sur disque."""
+        return read_json_file(self.data_file)
+
+    def log_add(self, media_id, media):
+        """Enregistre un ajout (rien à journaliser: le prochain commit réécrit tout)."""
+        self._pending_records += 1
+
+    def log_delete(self, media_id):
+        """Enregistre une suppression."""
+        self._pending_records += 1
+
+    def prepare_commit(self, media_data):
+        """Sérialise les mutations en attente. Retourne None s'il n'y a rien à écrire."""
+        if not self._pending_records:
+            return None
+        return self.prepare_snapshot(media_data)
+
+    def prepare_snapshot(self, media_data):
+        """Prépare la réécriture complète du fichier."""
+        text = dump_snapshot(media_data)
+        records, self._pending_records = self._pending_records, 0
+
+        def restore():
+            self._pending_records += records
+        return PendingWrite(lambda: self._write_snapshot(text), records, restore)
+
+    def _write_snapshot(self, text):
+        try:
+            write_text_atomic(self.data_file, text)
+        except Exception as e:
+            # L'écriture atomique laisse l'ancien fichier intact
+            raise StorageError(f"Could not write data to '{self.data_file}': {e}") from e
+
+    def changed_externally(self):
+        """Un seul processus écrit ces fichiers: jamais de modification externe."""
+        return False
+
+    def poll_changes(self):
+        """Un seul processus écrit ce fichier: aucune modification externe à intégrer."""
+        return []
+
+    def open_reader(self):
+        """Pas de lecture par ID avant le chargement complet pour ce mode: retourne None."""
+        return None
+
+    def close(self):
+        """Libère les ressources du backend (aucune pour ce mode)."""
+
+
+class JournalStorage:
+    """
+    Stockage en journal (write-ahead log) append-only.
+
+    Chaque mutation est ajoutée comme une ligne JSON dans `<data>.journal`:
+        {"op": "add", "id": "10", "media": {...}}
+        {"op": "delete", "id": "10"}
+    Au démarrage, le snapshot JSON est chargé puis le journal est rejoué.
+    Quand le journal dépasse `compact_every` enregistrements, un snapshot complet
+    est réécrit (atomiquement) et le journal est tronqué.
+    """
+
+    name = 'journal'
+
+    def __init__(self, data_file, compact_every=DEFAULT_COMPACT_EVERY):
+        self.data_file = data_file
+        self.journal_file = os.path.splitext(data_file)[0] + '.journal'
+        self.id_file = _id_file(data_file)
+        self.compact_every = compact_every
+        self._pending = []
+        self._journal_records = 0
+        self._journal = None
+
+    def reserve_id_block(self, floor, size):
+        """Réserve un bloc d'IDs dans le fichier `<data>.ids` (voir IdAllocator)."""
+        return reserve_id_block_in_file(self.id_file, floor, size)
+
+    @property
+    def snapshot_file(self):
+        """Fichier du snapshot complet (le fichier de données JSON pour ce mode)."""
+        return self.data_file
+
+    def load(self):
+        """Charge le snapshot puis rejoue le journal. Une ligne tronquée en fin de fichier est ignorée."""
+        media_data = self._read_snapshot()
+        for media_id, media in self._read_journal():
+            if media is None:
+                media_data.pop(media_id, None)
+            else:
+                media_data[media_id] = media
+        return media_data
+
+    def _read_snapshot(self):
+        return read_json_file(self.data_file)
+
+    def _read_journal(self):
+        """Lit le journal: liste [(ID, média ou None si supprimé)]. Tronque une fin de fichier déchirée."""
+        changes = []
+        if not os.path.exists(self.journal_file):
+            return changes
+
+        valid_size = 0
+        with open(self.journal_file, 'rb') as f:
+            for raw_line in f:
+                try:
+                    record = json.loads(raw_line)
+                    op = record['op']
+                    media_id = record['id']
+                    media = record['media'] if op == 'add' else None
+                except (ValueError, KeyError, TypeError):
+                    # Écriture interrompue par un crash: on s'arrête au dernier enregistrement valide
+                    print(f"WARNING: Journal '{self.journal_file}' has a torn record at offset {valid_size}. Truncating.")
+                    break
+                if op in ('add', 'delete'):
+                    changes.append((media_id, media))
+                valid_size += len(raw_line)
+        self._journal_records = len(changes)
+
+        if valid_size < os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_size)
+        return changes
+
+    def open_reader(self):
+        """Pas de lecture par ID avant le chargement complet pour ce mode: retourne None."""
+        return None
+
+    def log_add(self, media_id, media):
+        """Met en attente un enregistrement d'ajout."""
+        self._pending.append({"op": "add", "id": media_id, "media": media})
+
+    def log_delete(self, media_id):
+        """Met en attente un enregistrement de suppression."""
+        self._pending.append({"op": "delete", "id": media_id})
+
+    def prepare_commit(self, media_data):
+        """
+        Sérialise les enregistrements en attente en une seule écriture.
+        Si le seuil de compaction est atteint, prépare un snapshot complet à la place.
+        """
+        if not self._pending:
+            return None
+        if self._journal_records + len(self._pending) >= self.compact_every:
+            return self.prepare_snapshot(media_data)
+
+        payload = b''.join(
+            json.dumps(record, separators=(',', ':'), default=_json_default).encode('utf-8') + b'\n'
+            for record in self._pending
+        )
+        batch = self._pending
+        self._journal_records += len(batch)
+        self._pending = []
+
+        def restore():
+            self._pending = batch + self._pending
+            self._journal_records -= len(batch)
+        return PendingWrite(lambda: self._append(payload), len(batch), restore)
+
+    def _append(self, payload):
+        """Ajoute le lot au journal. En cas d'échec, le journal est ramené à sa taille précédente."""
+        size_before = None
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'ab')
+            size_before = os.fstat(self._journal.fileno()).st_size
+            self._journal.write(payload)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        except Exception as e:
+            # Une ligne partielle laissée en place masquerait au rejeu tout ce qui suit
+            self._discard_partial_append(size_before)
+            raise StorageError(f"Could not append to journal '{self.journal_file}': {e}") from e
+
+    def _discard_partial_append(self, size_before):
+        if self._journal is not None:
+            try:
+                self._journal.close()
+            except OSError:
+                pass
+            self._journal = None
+        if size_before is None:
+            return
+        try:
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(size_before)
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"FATAL ERROR: Could not truncate journal '{self.journal_file}' after a failed append: {e}")
+
+    def _encode_snapshot(self, media_data):
+        return dump_snapshot(media_data)
+
+    def prepare_snapshot(self, media_data):
+        """Prépare un snapshot complet qui remplacera le journal (compaction)."""
+        text = self._encode_snapshot(media_data)
+        # Le snapshot contient tout: ce qui attendait n'a plus besoin d'être journalisé
+        batch, journal_records = self._pending, self._journal_records
+        self._pending = []
+        self._journal_records = 0
+
+        def restore():
+            self._pending = batch + self._pending
+            self._journal_records += journal_records
+        return PendingWrite(lambda: self._write_snapshot(text), len(batch), restore)
+
+    def _write_snapshot(self, text):
+        """Écrit un snapshot complet puis tronque le journal (compaction)."""
+        try:
+            write_text_atomic(self.snapshot_file, text)
+        except Exception as e:
+            # L'ancien snapshot et le journal restent intacts
+            raise StorageError(f"Could not write data to '{self.snapshot_file}': {e}") from e
+        # Un crash entre les deux étapes est sans danger: le rejeu est idempotent.
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        with open(self.journal_file, 'wb') as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def changed_externally(self):
+        """Un seul processus écrit ces fichiers: jamais de modification externe."""
+        return False
+
+    def poll_changes(self):
+        """Un seul processus écrit le journal: aucune modification externe à intégrer."""
+        return []
+
+    def close(self):
+        """Ferme le descripteur du journal."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class SnapshotLookup:
+    """
+    Lecture par ID pendant le chargement en arrière-plan: le journal (petit, déjà en mémoire)
+    masque le snapshot binaire, interrogé directement sur disque via son index.
+    """
+
+    def __init__(self, reader, journal_changes):
+        self._reader = reader
+        self._overlay = dict(journal_changes)
+
+    def get(self, media_id):
+        """Retourne le média (dict) d'ID `media_id`, ou None."""
+        if media_id in self._overlay:
+            return self._overlay[media_id]
+        return self._reader.get(media_id)
+
+
+class BinarySnapshotStorage(JournalStorage):
+    """
+    Journal append-only dont les snapshots sont au format binaire indexé (`<data>.snapshot`,
+    voir binary_snapshot). Au démarrage, un média peut être lu par ID directement dans
+    le snapshot (`open_reader`) pendant que le catalogue complet se charge.
+    Sans snapshot binaire, le fichier JSON existant est chargé puis converti au premier commit.
+    """
+
+    name = 'binary'
+
+    def __init__(self, data_file, compact_every=DEFAULT_COMPACT_EVERY):
+        super().__init__(data_file, compact_every=compact_every)
+        self._snapshot_file = os.path.splitext(data_file)[0] + '.snapshot'
+
+    @property
+    def snapshot_file(self):
+        return self._snapshot_file
+
+    def _read_snapshot(self):
+        if not os.path.exists(self._snapshot_file):
+            return read_json_file(self.data_file)
+        reader = SnapshotReader(self._snapshot_file)
+        try:
+            return reader.load()
+        finally:
+            reader.close()
+
+    def _encode_snapshot(self, media_data):
+        return encode_snapshot(media_data)
+
+    def prepare_commit(self, media_data):
+        """Comme le journal, mais le premier commit écrit le snapshot binaire s'il n'existe pas encore."""
+        if self._pending and not os.path.exists(self._snapshot_file):
+            return self.prepare_snapshot(media_data)
+        return super().prepare_commit(media_data)
+
+    def open_reader(self):
+        """Retourne un SnapshotLookup (snapshot + journal), ou None s'il n'y a pas encore de snapshot binaire."""
+        if not os.path.exists(self._snapshot_file):
+            return None
+        return SnapshotLookup(SnapshotReader(self._snapshot_file), self._read_journal())
+
+
+class SqliteStorage:
+    """
+    Stockage SQLite (mode WAL), partageable entre plusieurs processus (ex: workers gunicorn).
+
+    Chaque processus garde sa copie en mémoire (et ses index) et intègre les écritures
+    des autres processus via `poll_changes`: toute mutation est aussi inscrite dans la
+    table `changes`, relue de façon incrémentale quand `PRAGMA data_version` indique
+    qu'une autre connexion a écrit. L'allocation des IDs passe par la table `meta`,
+    dans une transaction, pour qu'aucun ID ne soit attribué deux fois.
+    """
+
+    name = 'sqlite'
+    COLUMNS = ("name", "author", "publication_date", "category", "creation_date")
+    # Nombre de lignes conservées dans la table `changes` (au-delà, un processus en retard recharge tout)
+    CHANGES_RETENTION = 10000
+
+    def __init__(self, data_file, db_file=None):
+        self.data_file = data_file
+        self.db_file = db_file or os.path.splitext(data_file)[0] + '.sqlite3'
+        self._conn_lock = threading.Lock()
+        # isolation_level=None: transactions explicites (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None, timeout=30)
+        self._pending = []
+        # IDs dont l'écriture est préparée mais pas encore en base
+        self._in_flight = {}
+        self._seen_change = 0
+        self._data_version = None
+        with self._conn_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS media (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    publication_date TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    creation_date TEXT
+                );
+                CREATE INDEX IF NOT EXISTS media_category ON media (category);
+                CREATE INDEX IF NOT EXISTS media_name ON media (name);
+                CREATE INDEX IF NOT EXISTS media_publication_date ON media (publication_date);
+                CREATE TABLE IF NOT EXISTS changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+            """)
+
+    def _row_to_media(self, row):
+        return {column: value for column, value in zip(self.COLUMNS, row) if value is not None}
+
+    def load(self):
+        """Charge toute la table `media` et mémorise la position dans le flux de changements."""
+        with self._conn_lock:
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            self._seen_change = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT id, name, author, publication_date, category, creation_date FROM media ORDER BY rowid"
+            ).fetchall()
+        return {row[0]: self._row_to_media(row[1:]) for row in rows}
+
+    def log_add(self, media_id, media):
+        """Met en attente une insertion."""
+        self._pending.append((media_id, media))
+
+    def log_delete(self, media_id):
+        """Met en attente une suppression."""
+        self._pending.append((media_id, None))
+
+    def prepare_commit(self, media_data):
+        """Prépare une transaction contenant toutes les mutations en attente."""
+        if not self._pending:
+            return None
+        batch = self._pending
+        self._pending = []
+        self._track_in_flight(batch, 1)
+
+        def restore():
+            self._pending = batch + self._pending
+        return PendingWrite(lambda: self._write_batch(batch, replace_all=False), len(batch), restore)
+
+    def _track_in_flight(self, batch, delta):
+        for media_id, _ in batch:
+            count = self._in_flight.get(media_id, 0) + delta
+            if count:
+                self._in_flight[media_id] = count
+            else:
+                self._in_flight.pop(media_id, None)
+
+    def prepare_snapshot(self, media_data):
+        """Prépare le remplacement complet de la table par `media_data` (une transaction)."""
+        batch = list(media_data.items())
+        absorbed = self._pending
+        self._pending = []
+        self._track_in_flight(batch, 1)
+
+        def restore():
+            self._pending = absorbed + self._pending
+        return PendingWrite(lambda: self._write_batch(batch, replace_all=True), len(absorbed), restore)
+
+    def _write_batch(self, batch, replace_all):
+        media_rows = [
+            (media_id, *(media.get(column) for column in self.COLUMNS))
+            for media_id, media in batch if media is not None
+        ]
+        deleted_ids = [(media_id,) for media_id, media in batch if media is None]
+        try:
+            with self._conn_lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    last_change = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+                    if replace_all:
+                        self._conn.execute("DELETE FROM media")
+                    self._conn.executemany("DELETE FROM media WHERE id = ?", deleted_ids)
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO media (id, name, author, publication_date, category, creation_date) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        media_rows
+                    )
+                    if replace_all:
+                        # Les autres processus doivent tout recharger: on purge le flux de changements
+                        self._conn.execute("DELETE FROM changes")
+                        self._conn.execute("INSERT INTO changes (id) VALUES ('')")
+                    else:
+                        self._conn.executemany("INSERT INTO changes (id) VALUES (?)", [(media_id,) for media_id, _ in batch])
+                        self._conn.execute(
+                            "DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?",
+                            (self.CHANGES_RETENTION,)
+                        )
+                    self._conn.execute("COMMIT")
+                    if last_change == self._seen_change:
+                        # Personne d'autre n'a écrit depuis la dernière synchronisation:
+                        # inutile de relire nos propres changements plus tard
+                        self._seen_change = self._conn.execute("SELECT MAX(seq) FROM changes").fetchone()[0]
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            raise StorageError(f"Could not write to '{self.db_file}': {e}") from e
+        finally:
+            self._track_in_flight(batch, -1)
+
+    def changed_externally(self):
+        """Test peu coûteux: une autre connexion a-t-elle écrit depuis la dernière synchronisation ?"""
+        with self._conn_lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version
+
+    def poll_changes(self):
+        """
+        Retourne les modifications faites par d'autres processus depuis le dernier appel:
+        une liste [(ID, media ou None si supprimé)], ou None si le processus est trop en
+        retard (ou si la table a été remplacée) et doit tout recharger via `load`.
+        À appeler sous le verrou en écriture des données: les IDs ayant une écriture locale
+        en attente sont ignorés (la version en mémoire est plus récente que la base).
+        """
+        with self._conn_lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return []
+            self._data_version = data_version
+            oldest = self._conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+            changed = self._conn.execute(
+                "SELECT seq, id FROM changes WHERE seq > ? ORDER BY seq", (self._seen_change,)
+            ).fetchall()
+            if not changed:
+                return []
+            if (oldest is not None and oldest > self._seen_change + 1) or any(media_id == '' for _, media_id in changed):
+                return None
+            self._seen_change = changed[-1][0]
+            locally_pending = {media_id for media_id, _ in self._pending}
+            result = []
+            for media_id in dict.fromkeys(media_id for _, media_id in changed):
+                if media_id in locally_pending or media_id in self._in_flight:
+                    continue
+                row = self._conn.execute(
+                    "SELECT name, author, publication_date, category, creation_date FROM media WHERE id = ?",
+                    (media_id,)
+                ).fetchone()
+                result.append((media_id, self._row_to_media(row) if row else None))
+            return result
+
+    def locally_pending_ids(self):
+        """IDs modifiés localement mais pas encore écrits en base."""
+        return {media_id for media_id, _ in self._pending} | set(self._in_flight)
+
+    def reserve_id_block(self, floor, size):
+        """Réserve un bloc d'IDs dans la table `meta`, atomiquement entre processus."""
+        with self._conn_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+                start = max(row[0] if row else 1, floor)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)", (start + size,)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return start
+
+    def open_reader(self):
+        """Pas de lecture par ID avant le chargement complet pour ce mode: retourne None."""
+        return None
+
+    def close(self):
+        """Ferme la connexion SQLite."""
+        with self._conn_lock:
+            self._conn.close()
+
+
+class CommitCoordinator:
+    """
+    Applique la politique de durabilité et regroupe les mutations concurrentes.
+
+    - 'fsync': chaque écrivain attend que sa mutation soit sur disque. Les mutations
+      arrivées pendant un fsync sont absorbées par l'écriture suivante.
+    - 'group': un thread de fond écrit toutes les `group_commit_ms` ms ou dès que
+      `group_commit_size` mutations attendent; les écrivains attendent ce commit groupé.
+    - 'async': même thread de fond, mais les écrivains n'attendent pas (risque de perte
+      des dernières mutations en cas de crash, jamais en cas d'arrêt propre via `close`).
+    """
+
+    def __init__(self, storage, data_lock, get_data, policy='fsync',
+                 group_commit_ms=5, group_commit_size=64):
+        if policy not in DURABILITY_POLICIES:
+            raise ValueError(f"Invalid durability policy: {policy}. Must be one of {list(DURABILITY_POLICIES)}")
+        self.storage = storage
+        self.policy = policy
+        self.group_commit_ms = group_commit_ms
+        self.group_commit_size = group_commit_size
+        # Verrou lecteurs/rédacteur des données (rwlock.ReadWriteLock). La préparation d'un
+        # commit se fait en lecture: les écrivains, seuls à toucher la file d'attente du
+        # stockage, sont exclus, mais les lecteurs continuent en parallèle.
+        self._data_lock = data_lock
+        self._get_data = get_data
+        # Ordre des verrous: _flush_lock -> _data_lock -> _cond
+        self._flush_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._logged_seq = 0
+        self._durable_seq = 0
+        self._closed = False
+        # Plus haute mutation dont l'écriture a échoué (les écrivains en attente sont prévenus)
+        self._failed_seq = 0
+        self._failed_flushes = 0
+        self._flushes = 0
+        self._writes_flushed = 0
+        self._max_batch = 0
+        self._recent_batches = deque(maxlen=100)
+        self._thread = None
+        if policy != 'fsync':
+            self._thread = threading.Thread(target=self._run, name='library-group-commit', daemon=True)
+            self._thread.start()
+
+    def note_mutation(self, count=1):
+        """Enregistre `count` mutations (appelé sous le verrou des données). Retourne le numéro de la dernière."""
+        with self._cond:
+            was_idle = self._logged_seq == self._durable_seq
+            self._logged_seq += count
+            pending = self._logged_seq - self._durable_seq
+            # Réveille le thread de fond dès la première mutation en attente (début du lot)
+            # puis quand le lot est plein
+            if was_idle or pending >= self.group_commit_size:
+                self._cond.notify_all()
+            return self._logged_seq
+
+    def wait_durable(self, seq):
+        """Bloque selon la politique jusqu'à ce que la mutation `seq` soit durable."""
+        if self.policy == 'fsync' or self._closed:
+            self.flush()
+        elif self.policy == 'group':
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._durable_seq >= seq or self._failed_seq >= seq or self._closed
+                )
+                durable = self._durable_seq >= seq
+            if not durable:
+                if not self._closed:
+                    raise StorageError(f"Mutation {seq} could not be written to disk.")
+                self.flush()
+
+    def flush(self):
+        """Écrit en une fois toutes les mutations en attente."""
+        with self._flush_lock:
+            with self._data_lock.read_lock:
+                pending = self.storage.prepare_commit(self._get_data())
+                target = self._logged_seq
+            self._write(pending, target)
+
+    def snapshot(self):
+        """Écrit un snapshot complet (absorbe aussi les mutations en attente)."""
+        with self._flush_lock:
+            with self._data_lock.read_lock:
+                pending = self.storage.prepare_snapshot(self._get_data())
+                target = self._logged_seq
+            self._write(pending, target)
+
+    def _write(self, pending, target):
+        if pending is not None:
+            try:
+                pending.write()
+            except StorageError:
+                # Les mutations restent en attente: elles ne sont pas déclarées durables
+                with self._data_lock.write_lock:
+                    pending.restore()
+                with self._cond:
+                    self._failed_flushes += 1
+                    self._failed_seq = max(self._failed_seq, target)
+                    self._cond.notify_all()
+                raise
+        with self._cond:
+            if pending is not None and pending.records:
+                self._flushes += 1
+                self._writes_flushed += pending.records
+                self._max_batch = max(self._max_batch, pending.records)
+                self._recent_batches.append(pending.records)
+            self._durable_seq = max(self._durable_seq, target)
+            self._cond.notify_all()
+
+    def _run(self):
+        """Boucle du thread de commit groupé."""
+        delay = self.group_commit_ms / 1000.0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._logged_seq > self._durable_seq or self._closed)
+                if self._closed:
+                    return
+                # Laisse le temps aux autres écrivains de rejoindre le lot
+                self._cond.wait_for(
+                    lambda: self._logged_seq - self._durable_seq >= self.group_commit_size or self._closed,
+                    timeout=delay
+                )
+            try:
+                self.flush()
+            except StorageError as e:
+                print(f"FATAL ERROR: {e}")
+                # Nouvelle tentative plus tard, sans boucler à vide
+                time.sleep(max(delay, 0.1))
+
+    def stats(self):
+        """Compteurs de durabilité: nombre de flushs et mutations absorbées par flush."""
+        with self._cond:
+            return {
+                "policy": self.policy,
+                "flushes": self._flushes,
+                "writes_flushed": self._writes_flushed,
+                "pending_writes": self._logged_seq - self._durable_seq,
+                "failed_flushes": self._failed_flushes,
+                "max_writes_per_flush": self._max_batch,
+                "avg_writes_per_flush": (self._writes_flushed / self._flushes) if self._flushes else 0.0,
+                "recent_writes_per_flush": list(self._recent_batches),
+            }
+
+    def close(self):
+        """Arrête le thread de fond et vide les écritures en attente (garantie à l'arrêt)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.flush()
+        finally:
+            self.storage.close()
+
+
+class IdAllocator:
+    """
+    Allocateur d'IDs numériques monotone (schéma hi/lo).
+
+    La borne haute des IDs réservés est persistée par le backend de stockage
+    (`reserve_id_block`) une fois par bloc de `block_size` IDs, et non à chaque ajout.
+    Après un redémarrage, l'allocation reprend après le dernier bloc réservé:
+    un ID n'est jamais réutilisé, même après une suppression (quitte à en sauter).
+    Non thread-safe: appelé sous le verrou des données de LibraryManager.
+    """
+
+    def __init__(self, storage, block_size=100):
+        self._storage = storage
+        self.block_size = block_size
+        self._next = 1
+        self._limit = 1
+        self._floor = 1
+
+    def observe(self, floor):
+        """Garantit que les prochains IDs sont >= `floor` (ex: IDs déjà présents dans les données)."""
+        self._floor = max(self._floor, floor)
+        if self._next < self._floor:
+            # Le bloc courant est périmé: le prochain appel en réservera un nouveau
+            self._next = self._limit = self._floor
+
+    def _reserve(self, count):
+        size = max(count, self.block_size)
+        self._next = self._storage.reserve_id_block(max(self._next, self._floor), size)
+        self._limit = self._next + size
+
+    def next_id(self):
+        """Retourne le prochain ID (chaîne), en O(1)."""
+        if self._next >= self._limit:
+            self._reserve(1)
+        media_id = self._next
+        self._next += 1
+        return str(media_id)
+
+    def reserve(self, count):
+        """Réserve `count` IDs consécutifs en une seule écriture (import en masse)."""
+        if count <= 0:
+            return []
+        if self._limit - self._next < count:
+            self._reserve(count)
+        start = self._next
+        self._next += count
+        return [str(media_id) for media_id in range(start, start + count)]
+
+
+STORAGE_MODES = {
+    JsonFileStorage.name: JsonFileStorage,
+    JournalStorage.name: JournalStorage,
+    BinarySnapshotStorage.name: BinarySnapshotStorage,
+    SqliteStorage.name: SqliteStorage,
+}
+
+
+def create_storage(mode, data_file, **options):
+    """Instancie le backend de stockage correspondant au mode demandé."""
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Invalid storage mode: {mode}. Must be one of {list(STORAGE_MODES)}")
+    return STORAGE_MODES[mode](data_file, **options)
+# STATUT: V1.1 - Backends de stockage JSON (réécriture complète) et journal append-only, commit groupé.
@@ -2,8 +2,18 @@ import unittest
 import json
 import os
 import shutil
+import threading
+import storage
 from unittest.mock import patch, mock_open
 from library_manager import LibraryManager, DATA_DIR, DATA_FILE
+from rwlock import ReadWriteLock
+from response_cache import CachedResponse, ResponseCache
+from media_record import MediaRecord
+from event_broker import EventBroker
+import metrics
+import serializers
+import profiling
+import migrate_to_sqlite
 
 # Configuration spécifique pour les tests
 TEST_DATA_DIR = 'test_data_manager'
@@ -129,6 +139,30 @@ class TestLibraryManager(unittest.TestCase):
         self.assertEqual(len(self.manager.media_data), initial_count - 1) # Devient 1
         self.assertIsNone(self.manager.get_media_by_id(self.test_delete_id))
 
+    def test_ids_are_never_reused(self):
+        """Un ID supprimé n'est jamais réattribué, y compris après redémarrage."""
+        first = self.manager.add_media("Item A", "X", "2024-01-01", "Book")['id']
+        self.assertEqual(first, "102")
+        self.manager.delete_media(first)
+        second = self.manager.add_media("Item B", "X", "2024-01-01", "Book")['id']
+        self.assertGreater(int(second), int(first))
+
+        restarted = LibraryManager()
+        third = restarted.add_media("Item C", "X", "2024-01-01", "Book")['id']
+        self.assertGreater(int(third), int(second))
+
+    def test_reserve_ids_returns_consecutive_block(self):
+        """Un bloc d'IDs consécutifs peut être réservé pour un import en masse."""
+        block = self.manager.reserve_ids(250)
+        self.assertEqual(len(block), 250)
+        self.assertEqual([int(i) for i in block], list(range(int(block[0]), int(block[0]) + 250)))
+        self.assertGreater(int(self.manager.add_media("Item", "X", "2024-01-01", "Book")['id']), int(block[-1]))
+
+    def test_legacy_non_numeric_ids_keep_numeric_allocation(self):
+        """Des IDs non numériques dans les données ne font plus basculer sur des UUID."""
+        self.manager.media_data = {"abc-legacy": dict(MOCK_DATA_CONTENT["100"]), **MOCK_DATA_CONTENT}
+        self.assertTrue(self.manager.add_media("Item", "X", "2024-01-01", "Book")['id'].isdigit())
+
     def test_delete_media_not_found(self):
         """Teste la tentative de suppression d'un ID qui n'existe pas."""
         initial_count = len(self.manager.media_data) # Devrait être 2
@@ -138,18 +172,214 @@ class TestLibraryManager(unittest.TestCase):
         self.assertFalse(success) # La suppression doit échouer
         self.assertEqual(len(self.manager.media_data), initial_count) # La liste ne doit pas changer (reste 2)
 
+    def test_failed_insert_leaves_nothing_behind(self):
+        """Un champ qui n'est pas une chaîne donne 400; un index en échec n'ajoute le média nulle part."""
+        import backend_server
+        version = self.manager.data_version
+        with patch.object(backend_server, 'manager', self.manager):
+            response = backend_server.app.test_client().post('/media', json={
+                "name": 123, "author": "X", "publication_date": "2024-01-01", "category": "Book"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("must be a string", response.get_json()["error"])
+
+        with patch.object(self.manager._fulltext_index, 'add', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                self.manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        self.assertEqual(self.manager.data_version, version)
+        self.assertEqual(len(self.manager.media_data), 2)
+        self.assertEqual(self.manager.get_category_counts(), {"Book": 1, "Film": 1})
+        self.assertEqual(self.manager.search_media_by_prefix("Dune"), [])
+        self.assertEqual(self.manager.get_media_stats()["total"], 2)
+
+    def test_batch_get_and_delete(self):
+        """Les opérations par lot signalent les IDs manquants et mettent les index à jour."""
+        found, missing = self.manager.get_media_batch(["101", "999", 100])
+        self.assertEqual([m['id'] for m in found], ["101", "100"])
+        self.assertEqual(missing, ["999"])
+
+        deleted, missing = self.manager.delete_media_batch(["100", "101", "999"])
+        self.assertEqual(deleted, ["100", "101"])
+        self.assertEqual(missing, ["999"])
+        self.assertEqual(self.manager.get_category_counts(), {})
+        self.assertIsNone(LibraryManager().get_media_by_id("100"))
+
     def test_search_media_by_name_success(self):
         """Teste la recherche par nom (insensible à la casse)."""
         media = self.manager.search_media_by_name("TEST eNtry 1 (book)")
         self.assertIsNotNone(media)
         self.assertEqual(media['id'], "100")
         
+    def test_search_media_by_name_ignores_accents(self):
+        """La recherche exacte ignore les accents et les espaces superflus."""
+        added = self.manager.add_media("La Communauté de l'Anneau", "J.R.R. Tolkien", "1954-07-29", "Book")
+        media = self.manager.search_media_by_name("  la communaute DE l'anneau ")
+        self.assertEqual(media['id'], added['id'])
+
+    def test_search_media_by_prefix(self):
+        """L'autocomplétion trouve les débuts de nom et de mot, et suit les suppressions."""
+        added = self.manager.add_media("Le Seigneur des Anneaux", "J.R.R. Tolkien", "1954-07-29", "Book")
+        self.assertEqual([m['id'] for m in self.manager.search_media_by_prefix("Test Entry")], ["100", "101"])
+        self.assertEqual([m['id'] for m in self.manager.search_media_by_prefix("seig")], [added['id']])
+        self.assertEqual(len(self.manager.search_media_by_prefix("test", limit=1)), 1)
+        self.manager.delete_media(added['id'])
+        self.assertEqual(self.manager.search_media_by_prefix("seig"), [])
+
+    def test_search_media_fulltext(self):
+        """La recherche plein texte couvre nom et auteur, en AND et en OR, classée par score."""
+        self.manager.add_media("Dune Messiah", "Frank Herbert", "1969-10-15", "Book")
+        self.manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        results = self.manager.search_media_fulltext("dune herbert")
+        self.assertEqual([m['name'] for m in results], ["Dune", "Dune Messiah"])
+        self.assertEqual(self.manager.search_media_fulltext("dune writer"), [])
+        either = self.manager.search_media_fulltext("messiah writer", operator='or')
+        self.assertEqual({m['name'] for m in either}, {"Dune Messiah", "Test Entry 2 (Film)"})
+        with self.assertRaises(ValueError):
+            self.manager.search_media_fulltext("dune", operator='xor')
+
     def test_get_media_by_category(self):
         """Teste le filtrage par catégorie (Film)."""
         films = self.manager.get_media_by_category("Film")
         self.assertEqual(len(films), 1)
         self.assertEqual(films[0]['name'], "Test Entry 2 (Film)") # Nom complet corrigé
 
+    def test_category_index_follows_mutations(self):
+        """L'index par catégorie est mis à jour par l'ajout et la suppression."""
+        added = self.manager.add_media("New Film", "C. Tester", "2024-03-03", "Film")
+        self.assertEqual(len(self.manager.get_media_by_category("Film")), 2)
+        self.manager.delete_media(self.test_delete_id)
+        films = self.manager.get_media_by_category("Film")
+        self.assertEqual([m['id'] for m in films], [added['id']])
+        self.assertEqual(self.manager.get_category_counts(), {"Book": 1, "Film": 1})
+
+    def test_list_media_pagination(self):
+        """La pagination par curseur parcourt tous les médias dans l'ordre des IDs, sans doublon."""
+        for i in range(5):
+            self.manager.add_media(f"Item {i}", "X", "2024-01-01", "Book" if i % 2 else "Film")
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.manager.list_media(limit=2, cursor=cursor)
+            seen.extend(media['id'] for media in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted(self.manager.media_data, key=int))
+
+        films, next_cursor = self.manager.list_media(category="Film", limit=10)
+        self.assertIsNone(next_cursor)
+        self.assertEqual(len(films), 4)
+
+    def test_iter_media_filters_by_category_and_creation_date(self):
+        """L'itération par lots filtre par catégorie et par date de création."""
+        added = self.manager.add_media("New Film", "X", "2024-01-01", "Film")
+        self.assertEqual([m['id'] for m in self.manager.iter_media(batch_size=1)], ["100", "101", added['id']])
+        self.assertEqual([m['id'] for m in self.manager.iter_media(category="Film", since="2000-01-01 00:00:00")], [added['id']])
+        self.assertEqual(list(self.manager.iter_media(since="9999-01-01 00:00:00")), [])
+
+    def test_add_media_bulk_reports_row_errors(self):
+        """L'import en masse insère les lignes valides et signale les autres sans s'arrêter."""
+        rows = [
+            {"name": "A", "author": "X", "publication_date": "2024-01-01", "category": "Book"},
+            {"name": "B", "author": "X", "publication_date": "2024-01-01", "category": "Podcast"},
+            {"name": "C", "author": "X", "category": "Film"},
+            {"name": "D", "author": "X", "publication_date": "2024-01-01", "category": "Film"},
+        ]
+        created, errors = self.manager.add_media_bulk(rows)
+        self.assertEqual([m['name'] for m in created], ["A", "D"])
+        self.assertEqual([e['index'] for e in errors], [1, 2])
+        self.assertEqual(int(created[1]['id']), int(created[0]['id']) + 1)
+        self.assertEqual(len(self.manager.get_media_by_category("Film")), 2)
+        self.assertEqual(len(LibraryManager().media_data), 4)
+
+    def test_publication_date_is_normalized_and_validated(self):
+        """Teste la normalisation des dates ("2025-12-7") et le rejet des dates invalides."""
+        added = self.manager.add_media("Late", "X", "2025-12-7", "Book")
+        self.assertEqual(added['publication_date'], "2025-12-07")
+        for bad_date in ("2025-13-01", "2025-02-30", "yesterday", "2025"):
+            with self.assertRaises(ValueError):
+                self.manager.add_media("Bad", "X", bad_date, "Book")
+
+    def test_list_media_by_publication_date_range(self):
+        """Teste l'intervalle de dates (bornes partielles incluses), combiné à la catégorie et paginé."""
+        for name, date, category in [("F95", "1995-06-01", "Film"), ("B99", "1999-01-01", "Book"),
+                                     ("F90", "1990-01-01", "Film"), ("F01", "2001-01-01", "Film")]:
+            self.manager.add_media(name, "X", date, category)
+        films, cursor = self.manager.list_media_by_publication_date("1990", "2000", category="Film")
+        self.assertEqual([m['name'] for m in films], ["F90", "F95"])
+        self.assertIsNone(cursor)
+        first, cursor = self.manager.list_media_by_publication_date("1990", "2000", limit=2)
+        rest, last_cursor = self.manager.list_media_by_publication_date("1990", "2000", limit=2, cursor=cursor)
+        self.assertEqual([m['name'] for m in first + rest], ["F90", "F95", "B99"])
+        self.assertIsNone(last_cursor)
+        with self.assertRaises(ValueError):
+            self.manager.list_media_by_publication_date("nineties")
+
+    def test_media_stats_follow_mutations_and_reload(self):
+        """Teste les agrégats (catégorie, décennie, top auteurs) après ajout, suppression et rechargement."""
+        self.manager.add_media("Dune Messiah", "Frank Herbert", "1969-10-01", "Book")
+        removed = self.manager.add_media("Children of Dune", "Frank Herbert", "1976-04-01", "Book")
+        self.manager.add_media("Blade Runner", "Ridley Scott", "1982-06-25", "Film")
+        self.manager.delete_media(removed['id'])
+        stats = self.manager.get_media_stats(top=1)
+        self.assertEqual(stats['total'], 4)
+        self.assertEqual(stats['by_category'], {"Book": 2, "Film": 2})
+        self.assertEqual(stats['by_decade'], {"1960s": 1, "1980s": 1, "2020s": 2})
+        self.assertEqual(stats['top_authors'], [{"author": "A. Author", "count": 1}])
+        self.manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        reloaded = LibraryManager().get_media_stats(top=1, include_authors=True)
+        self.assertEqual(reloaded['top_authors'], [{"author": "Frank Herbert", "count": 2}])
+        self.assertEqual(reloaded['by_author'], {"A. Author": 1, "B. Writer": 1, "Frank Herbert": 2, "Ridley Scott": 1})
+
+    def test_compact_records_behave_like_dicts(self):
+        """Teste que les enregistrements compacts se lisent, se copient et se sérialisent comme des dicts."""
+        added = self.manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        record = self.manager.media_data[added['id']]
+        self.assertIsInstance(record, MediaRecord)
+        self.assertEqual(record["name"], "Dune")
+        self.assertEqual({"id": added['id'], **record}, added)
+        self.assertEqual(json.loads(record.to_json(added['id'])), added)
+        # Les dates historiques non canoniques et les champs absents sont conservés tels quels
+        legacy = MediaRecord.from_mapping({"name": "Old", "author": "X", "publication_date": "2025-12-7", "category": "Book"})
+        self.assertEqual(dict(legacy), {"name": "Old", "author": "X", "publication_date": "2025-12-7", "category": "Book"})
+        self.assertNotIn("creation_date", legacy)
+        with open(TEST_DATA_FILE) as f:
+            self.assertEqual(json.load(f)[added['id']], {k: v for k, v in added.items() if k != 'id'})
+
+    def test_encoded_lists_match_dicts_and_follow_mutations(self):
+        """Teste que les listes pré-encodées (cache d'encodage) décrivent les mêmes médias que les dicts."""
+        def decoded(items):
+            return json.loads(serializers.join_array(items))
+
+        self.assertEqual(decoded(self.manager.get_all_media(encoded=True)), self.manager.get_all_media())
+        added = self.manager.add_media("Dune é", "Frank Herbert", "1965-08-01", "Book")
+        self.manager.delete_media("100")
+        self.assertEqual(decoded(self.manager.get_all_media(encoded=True)), self.manager.get_all_media())
+        self.assertEqual(decoded(self.manager.get_media_by_category("Book", encoded=True)), [added])
+        page, _ = self.manager.list_media(limit=1, encoded=True)
+        self.assertEqual(decoded(page), self.manager.list_media(limit=1)[0])
+        # Les deux encodeurs produisent le même document
+        record = self.manager.media_data[added['id']]
+        with patch.object(serializers, 'orjson', None):
+            self.assertEqual(json.loads(serializers.encode_media(added['id'], record)), added)
+            self.assertEqual(json.loads(serializers.dumps({"media": record})), {"media": dict(record)})
+
+        import backend_server
+        with patch.object(backend_server, 'manager', self.manager), \
+                patch.object(backend_server, 'response_cache', ResponseCache(max_bytes=0)):
+            client = backend_server.app.test_client()
+            self.assertEqual(client.get('/media').get_json(), self.manager.get_all_media())
+            self.assertEqual(client.get('/media?fields=name').get_json(),
+                             [{"id": media["id"], "name": media["name"]} for media in self.manager.get_all_media()])
+
+    def test_legacy_non_string_fields_are_loaded_and_indexed(self):
+        """Des champs historiques qui ne sont pas des chaînes n'empêchent pas le démarrage."""
+        with open(TEST_DATA_FILE, 'w') as f:
+            json.dump({"7": {"name": 1984, "author": ["X"], "publication_date": "1949-06-08", "category": "Book"},
+                       **MOCK_DATA_CONTENT}, f)
+        manager = LibraryManager()
+        self.assertEqual(manager.get_media_by_id("7")["name"], 1984)
+        self.assertEqual(manager.search_media_by_name("1984")["id"], "7")
+        self.assertEqual(manager.get_media_stats(include_authors=True)["by_author"]["['X']"], 1)
+        self.assertTrue(manager.delete_media("7"))
+
     def test_add_media_invalid_category(self):
         """Teste l'ajout avec une catégorie non valide."""
         invalid_media = {
@@ -161,6 +391,553 @@ class TestLibraryManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.manager.add_media(**invalid_media)
 
+    def test_data_version_changes_on_mutation(self):
+        """Teste que la version des données avance à chaque mutation, et seulement alors."""
+        version = self.manager.data_version
+        self.manager.get_all_media()
+        self.assertEqual(self.manager.data_version, version)
+        self.manager.add_media("V", "A", "2024-01-01", "Book")
+        self.assertGreater(self.manager.data_version, version)
+
+    def test_change_feed_returns_latest_state_since_version(self):
+        """Teste le flux de changements: état courant par ID depuis une version, reset si elle est inconnue."""
+        version = self.manager.change_token
+        added = self.manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        self.manager.delete_media("100")
+        other = self.manager.add_media("Temp", "X", "2000-01-01", "Film")
+        self.manager.delete_media(other['id'])
+
+        feed = self.manager.get_changes(version)
+        self.assertFalse(feed["reset"])
+        self.assertEqual(feed["version"], self.manager.change_token)
+        self.assertEqual(feed["changes"], [
+            {"op": "add", "media": added},
+            {"op": "delete", "id": "100"},
+            {"op": "delete", "id": other['id']},
+        ])
+        self.assertEqual(self.manager.get_changes(feed["version"])["changes"], [])
+
+        # Aucun état connu, version antérieure au chargement ou future: catalogue complet
+        for since in ("0", self.manager.format_change_token(0),
+                      self.manager.format_change_token(self.manager.data_version + 1)):
+            reset = self.manager.get_changes(since)
+            self.assertTrue(reset["reset"])
+            self.assertEqual(sorted(change["media"]["id"] for change in reset["changes"]), ["101", added['id']])
+        with self.assertRaises(ValueError):
+            self.manager.get_changes("abc:x")
+
+    def test_change_feed_resets_after_restart(self):
+        """Un jeton d'avant un redémarrage donne un reset, même si la nouvelle version l'a dépassé."""
+        token = self.manager.change_token
+        self.manager.close()
+        restarted = LibraryManager()
+        restarted.delete_media("100")
+        for name in ("A", "B", "C"):
+            restarted.add_media(name, "X", "2024-01-01", "Book")
+        self.assertGreater(restarted.data_version, int(token.rpartition(':')[2]))
+        feed = restarted.get_changes(token)
+        self.assertTrue(feed["reset"])
+        self.assertEqual(len(feed["changes"]), 4)
+        self.assertNotIn("100", [change["media"]["id"] for change in feed["changes"]])
+
+    def test_response_cache_is_invalidated_by_version_and_bounded(self):
+        """Teste l'invalidation par version et l'éviction LRU du cache de réponses."""
+        cache = ResponseCache(max_bytes=10)
+        cache.put("a", 1, CachedResponse(b"12345", "application/json", {}))
+        self.assertEqual(cache.get("a", 1).etag, CachedResponse(b"12345", None, {}).etag)
+        self.assertIsNone(cache.get("a", 2))
+        cache.put("a", 2, CachedResponse(b"123456", "application/json", {}))
+        cache.put("b", 2, CachedResponse(b"123456", "application/json", {}))
+        self.assertIsNone(cache.get("a", 2))
+        self.assertIsNotNone(cache.get("b", 2))
+
+
+class TestJournalStorage(unittest.TestCase):
+    """Tests du mode de stockage en journal append-only."""
+
+    def setUp(self):
+        """Redirige le Manager vers un répertoire de test vide."""
+        self._original_data_file = LibraryManager.DATA_FILE
+        self._original_data_dir = LibraryManager.DATA_DIR
+        LibraryManager.DATA_FILE = TEST_DATA_FILE
+        LibraryManager.DATA_DIR = TEST_DATA_DIR
+        if os.path.exists(TEST_DATA_DIR):
+            shutil.rmtree(TEST_DATA_DIR)
+        self.journal_file = os.path.join(TEST_DATA_DIR, 'media_data.journal')
+
+    def tearDown(self):
+        LibraryManager.DATA_FILE = self._original_data_file
+        LibraryManager.DATA_DIR = self._original_data_dir
+        if os.path.exists(TEST_DATA_DIR):
+            shutil.rmtree(TEST_DATA_DIR)
+
+    def test_mutations_are_replayed_on_startup(self):
+        """Les ajouts et suppressions journalisés sont retrouvés après redémarrage."""
+        manager = LibraryManager(storage_mode='journal')
+        added = manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        manager.delete_media("1")
+        manager.close()
+
+        reloaded = LibraryManager(storage_mode='journal')
+        self.assertEqual(reloaded.get_media_by_id(added['id'])['name'], "Dune")
+        self.assertIsNone(reloaded.get_media_by_id("1"))
+        self.assertEqual(len(reloaded.media_data), 2)
+
+    def test_torn_record_is_ignored(self):
+        """Une ligne tronquée (crash en cours d'écriture) est ignorée et retirée du journal."""
+        manager = LibraryManager(storage_mode='journal')
+        manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        manager.close()
+        with open(self.journal_file, 'a') as f:
+            f.write('{"op": "add", "id": "99", "med')
+
+        reloaded = LibraryManager(storage_mode='journal')
+        self.assertEqual(len(reloaded.media_data), 3)
+        self.assertIsNone(reloaded.get_media_by_id("99"))
+        with open(self.journal_file) as f:
+            self.assertTrue(f.read().endswith('\n'))
+
+    def test_journal_record_without_media_is_ignored(self):
+        """Un ajout sans champ 'media' est traité comme un enregistrement invalide."""
+        manager = LibraryManager(storage_mode='journal')
+        manager.close()
+        with open(self.journal_file, 'a') as f:
+            f.write('{"op": "add", "id": "99"}\n')
+
+        reloaded = LibraryManager(storage_mode='journal')
+        self.assertIsNone(reloaded.get_media_by_id("99"))
+        self.assertEqual(os.path.getsize(self.journal_file), 0)
+
+    def test_failed_append_is_not_reported_durable(self):
+        """Un échec d'écriture lève StorageError, ne laisse pas de ligne partielle et est rejoué ensuite."""
+        manager = LibraryManager(storage_mode='journal')
+        with patch('storage.os.fsync', side_effect=OSError("No space left on device")):
+            with self.assertRaises(storage.StorageError):
+                manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        self.assertEqual(os.path.getsize(self.journal_file), 0)
+
+        manager.add_media("Inception", "Christopher Nolan", "2010-07-16", "Film")
+        manager.close()
+        names = {m['name'] for m in LibraryManager(storage_mode='journal').get_all_media()}
+        self.assertIn("Dune", names)
+        self.assertIn("Inception", names)
+
+    def test_compaction_truncates_journal(self):
+        """Au-delà du seuil, un snapshot est écrit et le journal est vidé."""
+        manager = LibraryManager(storage_mode='journal', compact_every=3)
+        for i in range(3):
+            manager.add_media(f"Item {i}", "Author", "2020-01-01", "Magazine")
+        self.assertEqual(os.path.getsize(self.journal_file), 0)
+        with open(TEST_DATA_FILE) as f:
+            self.assertEqual(len(json.load(f)), 5)
+
+    def test_group_commit_coalesces_concurrent_writes(self):
+        """En mode 'group', plusieurs mutations concurrentes partagent un même flush."""
+        manager = LibraryManager(storage_mode='journal', durability='group', group_commit_ms=50)
+        before = manager.get_persistence_stats()
+        threads = [
+            threading.Thread(target=manager.add_media, args=(f"Item {i}", "Author", "2020-01-01", "Book"))
+            for i in range(20)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = manager.get_persistence_stats()
+        manager.close()
+
+        self.assertEqual(stats['writes_flushed'] - before['writes_flushed'], 20)
+        self.assertLess(stats['flushes'] - before['flushes'], 20)
+        self.assertEqual(len(LibraryManager(storage_mode='journal').media_data), 22)
+
+    def test_group_commit_single_write_is_flushed(self):
+        """En mode 'group', une mutation isolée est écrite sans attendre un lot complet."""
+        result = {}
+
+        def run():
+            manager = LibraryManager(storage_mode='journal', durability='group', group_commit_ms=20)
+            result['media'] = manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+            result['stats'] = manager.get_persistence_stats()
+            manager.close()
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive(), "add_media blocked in group commit mode")
+        self.assertEqual(result['stats']['pending_writes'], 0)
+
+    def test_async_writes_are_flushed_in_background(self):
+        """En mode 'async', le thread de fond écrit sans attendre un lot complet ni close()."""
+        manager = LibraryManager(storage_mode='journal', durability='async', group_commit_ms=10)
+        manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        for _ in range(100):
+            if manager.get_persistence_stats()['pending_writes'] == 0:
+                break
+            threading.Event().wait(0.02)
+        self.assertEqual(manager.get_persistence_stats()['pending_writes'], 0)
+        manager.close()
+
+    def test_async_writes_are_flushed_on_close(self):
+        """En mode 'async', close() garantit que tout est écrit."""
+        manager = LibraryManager(storage_mode='journal', durability='async', group_commit_ms=10000)
+        manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        manager.close()
+        self.assertEqual(len(LibraryManager(storage_mode='journal').media_data), 3)
+
+
+    def test_binary_snapshot_round_trip(self):
+        """Le mode binaire écrit un snapshot indexé au premier commit et rejoue le journal par-dessus."""
+        manager = LibraryManager(storage_mode='binary')
+        self.assertTrue(os.path.exists(os.path.join(TEST_DATA_DIR, 'media_data.snapshot')))
+        added = manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        manager.delete_media("1")
+        manager.close()
+
+        reloaded = LibraryManager(storage_mode='binary')
+        self.assertEqual(reloaded.get_media_by_id(added['id']), added)
+        self.assertIsNone(reloaded.get_media_by_id("1"))
+        self.assertEqual(len(reloaded.media_data), 2)
+
+    def test_binary_snapshot_serves_lookups_while_loading(self):
+        """Pendant le chargement en arrière-plan, les lectures par ID sont servies depuis le disque."""
+        manager = LibraryManager(storage_mode='binary')
+        journaled = manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        manager.delete_media("1")
+        manager.close()
+
+        release = threading.Event()
+        original_load = LibraryManager._load_data
+
+        def slow_load(manager_self):
+            release.wait(5)
+            return original_load(manager_self)
+
+        with patch.object(LibraryManager, '_load_data', slow_load):
+            reloaded = LibraryManager(storage_mode='binary')
+            self.assertFalse(reloaded.is_loaded)
+            self.assertEqual(reloaded.get_media_by_id("2")['name'], "Inception")
+            self.assertEqual(reloaded.get_media_by_id(journaled['id']), journaled)
+            self.assertIsNone(reloaded.get_media_by_id("1"))
+            release.set()
+            self.assertEqual(len(reloaded.get_all_media()), 2)
+        self.assertTrue(reloaded.is_loaded)
+
+
+class TestConcurrency(unittest.TestCase):
+    """Tests de charge: lectures et écritures concurrentes sur un même Manager."""
+
+    def setUp(self):
+        self._original_data_file = LibraryManager.DATA_FILE
+        self._original_data_dir = LibraryManager.DATA_DIR
+        LibraryManager.DATA_FILE = TEST_DATA_FILE
+        LibraryManager.DATA_DIR = TEST_DATA_DIR
+        if os.path.exists(TEST_DATA_DIR):
+            shutil.rmtree(TEST_DATA_DIR)
+
+    def tearDown(self):
+        LibraryManager.DATA_FILE = self._original_data_file
+        LibraryManager.DATA_DIR = self._original_data_dir
+        if os.path.exists(TEST_DATA_DIR):
+            shutil.rmtree(TEST_DATA_DIR)
+
+    def test_readers_run_in_parallel_and_writers_are_exclusive(self):
+        """Deux lecteurs tiennent le verrou ensemble; un rédacteur attend qu'ils sortent."""
+        lock = ReadWriteLock()
+        both_reading = threading.Barrier(2, timeout=5)
+        writer_done = threading.Event()
+
+        def reader():
+            with lock.read_lock:
+                both_reading.wait()
+                self.assertFalse(writer_done.wait(0.05))
+
+        def writer():
+            with lock.write_lock:
+                writer_done.set()
+
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        for t in readers:
+            t.start()
+        writer_thread = threading.Thread(target=writer)
+        writer_thread.start()
+        for t in readers + [writer_thread]:
+            t.join(timeout=5)
+        self.assertTrue(writer_done.is_set())
+
+    def test_concurrent_reads_and_writes_stress(self):
+        """Lectures (liste, catégorie, pagination, recherche) pendant des ajouts/suppressions concurrents."""
+        manager = LibraryManager(storage_mode='journal', durability='group', group_commit_ms=2)
+        errors = []
+        stop = threading.Event()
+
+        def writer(worker):
+            try:
+                for i in range(100):
+                    media = manager.add_media(f"Stress {worker} {i}", "Load Tester", "2020-01-01",
+                                              manager.categories_allowed[i % 3])
+                    if i % 2:
+                        manager.delete_media(media['id'])
+            except Exception as e:
+                errors.append(e)
+
+        def reader():
+            try:
+                while not stop.is_set():
+                    all_media = manager.get_all_media()
+                    self.assertEqual(len({m['id'] for m in all_media}), len(all_media))
+                    for media in manager.get_media_by_category("Film"):
+                        self.assertEqual(media['category'], "Film")
+                    page, _ = manager.list_media(limit=50)
+                    self.assertEqual([m['id'] for m in page], sorted((m['id'] for m in page), key=int))
+                    manager.search_media_fulltext("stress tester", limit=5)
+                    manager.search_media_by_prefix("stress", limit=5)
+                    # Laisse le GIL aux écrivains (sinon la boucle de lecture les affame)
+                    stop.wait(0.001)
+            except Exception as e:
+                errors.append(e)
+
+        writers = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for t in writers + readers:
+            t.start()
+        for t in writers:
+            t.join(timeout=60)
+        stop.set()
+        for t in readers:
+            t.join(timeout=60)
+        manager.close()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(manager.media_data), 2 + 4 * 50)
+        self.assertEqual(sum(manager.get_category_counts().values()), len(manager.media_data))
+        self.assertEqual(len(LibraryManager(storage_mode='journal').media_data), 2 + 4 * 50)
+
+
+class TestEventStream(unittest.TestCase):
+    """Tests du flux Server-Sent Events GET /media/events (via le client de test Flask)."""
+
+    def setUp(self):
+        self._original_data_file = LibraryManager.DATA_FILE
+        self._original_data_dir = LibraryManager.DATA_DIR
+        LibraryManager.DATA_FILE = TEST_DATA_FILE
+        LibraryManager.DATA_DIR = TEST_DATA_DIR
+        if os.path.exists(TEST_DATA_DIR):
+            shutil.rmtree(TEST_DATA_DIR)
+        # Importé ici: le module crée son Manager à l'import (dans le répertoire de test)
+        import backend_server
+        self.manager = LibraryManager()
+        self.broker = EventBroker(queue_size=5, history_size=3)
+        self.manager.add_listener(self.broker.publish)
+        patcher = patch.multiple(backend_server, manager=self.manager, event_broker=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = backend_server.app.test_client()
+
+    def tearDown(self):
+        self.manager.close()
+        LibraryManager.DATA_FILE = self._original_data_file
+        LibraryManager.DATA_DIR = self._original_data_dir
+        if os.path.exists(TEST_DATA_DIR):
+            shutil.rmtree(TEST_DATA_DIR)
+
+    def _open_stream(self, **kwargs):
+        response = self.client.get('/media/events', buffered=False, **kwargs)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        chunks = response.iter_encoded()
+        self.assertEqual(next(chunks), b": connected\n\n")
+        return response, chunks
+
+    @staticmethod
+    def _parse(chunk):
+        fields = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n"))
+        return fields["id"], fields["event"], json.loads(fields["data"])
+
+    def test_many_subscribers_receive_adds_and_deletes(self):
+        """Chaque abonné reçoit les ajouts et suppressions, dans l'ordre, puis est désinscrit à la fermeture."""
+        streams = [self._open_stream() for _ in range(50)]
+        self.assertEqual(self.broker.stats()["subscribers"], 50)
+        added = self.manager.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        self.manager.delete_media("1")
+
+        for response, chunks in streams:
+            add_id, name, data = self._parse(next(chunks))
+            self.assertEqual((name, data), ("add", {"op": "add", "media": added}))
+            delete_id, name, data = self._parse(next(chunks))
+            self.assertEqual((name, data), ("delete", {"op": "delete", "id": "1"}))
+            self.assertLess(self.manager.parse_change_token(add_id), self.manager.parse_change_token(delete_id))
+            response.close()
+        self.assertEqual(self.broker.stats()["subscribers"], 0)
+
+        # Reprise après le premier événement: seul le suivant est rejoué
+        response, chunks = self._open_stream(headers={"Last-Event-ID": str(add_id)})
+        self.assertEqual(self._parse(next(chunks))[:2], (delete_id, "delete"))
+        response.close()
+
+    def test_resume_outside_history_and_slow_subscriber_get_reset(self):
+        """Un ID de reprise trop ancien, ou un abonné trop lent, reçoit `reset` sans bloquer les écritures."""
+        slow, slow_chunks = self._open_stream()
+        for i in range(6):
+            self.manager.add_media(f"Item {i}", "Author", "2020-01-01", "Magazine")
+        self.assertEqual(self.broker.stats()["dropped_subscribers"], 1)
+        self.assertEqual(self._parse(next(slow_chunks))[1], "reset")
+        with self.assertRaises(StopIteration):
+            next(slow_chunks)
+        slow.close()
+
+        # ID trop ancien, puis ID d'un autre démarrage (même compteur, autre époque)
+        for last_id in (self.manager.format_change_token(1), f"0123456789ab:{self.manager.data_version - 1}"):
+            response, chunks = self._open_stream(query_string={"last_event_id": last_id})
+            event_id, name, data = self._parse(next(chunks))
+            self.assertEqual((event_id, name, data),
+                             (self.manager.change_token, "reset", {"version": self.manager.change_token}))
+            response.close()
+        self.assertEqual(self.client.get('/media/events', headers={"Last-Event-ID": "x"}).status_code, 400)
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests des métriques Prometheus (registre et GET /metrics)."""
+
+    def test_histogram_export_is_cumulative(self):
+        """Les intervalles d'un histogramme sont cumulés et les labels échappés."""
+        registry = metrics.MetricsRegistry()
+        histogram = registry.histogram('op_seconds', "Operation time.", ('name',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, 'say "hi"')
+        registry.counter('ops_total', "Operations.").inc(amount=3)
+        text = registry.render()
+        self.assertIn('op_seconds_bucket{name="say \\"hi\\"",le="0.1"} 1\n', text)
+        self.assertIn('op_seconds_bucket{name="say \\"hi\\"",le="1.0"} 3\n', text)
+        self.assertIn('op_seconds_bucket{name="say \\"hi\\"",le="+Inf"} 4\n', text)
+        self.assertIn('op_seconds_count{name="say \\"hi\\""} 4\n', text)
+        self.assertIn('# TYPE ops_total counter\nops_total 3\n', text)
+        with self.assertRaises(ValueError):
+            registry.counter('ops_total', "Duplicate.")
+
+    def test_timed_is_a_no_op_when_disabled(self):
+        """Désactivées, les métriques ne coûtent rien: la fonction décorée est renvoyée telle quelle."""
+        def operation():
+            return 42
+        with patch.object(metrics, 'ENABLED', False):
+            self.assertIs(metrics.timed(metrics.INDEX_SECONDS, 'test')(operation), operation)
+        with patch.object(metrics, 'ENABLED', True):
+            self.assertEqual(metrics.timed(metrics.INDEX_SECONDS, 'test')(operation)(), 42)
+
+    @unittest.skipUnless(metrics.ENABLED, "metrics disabled (LIBRARY_METRICS=0)")
+    def test_metrics_endpoint_reports_routes_and_manager_timers(self):
+        """GET /metrics compte les requêtes par route (et non par URL) et expose les durées internes."""
+        LibraryManager.DATA_FILE, LibraryManager.DATA_DIR = TEST_DATA_FILE, TEST_DATA_DIR
+        try:
+            import backend_server
+            client = backend_server.app.test_client()
+            client.get('/media/1')
+            client.get('/media/999999')
+            text = client.get('/metrics').get_data(as_text=True)
+        finally:
+            LibraryManager.DATA_FILE, LibraryManager.DATA_DIR = DATA_FILE, DATA_DIR
+            shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
+        self.assertIn('http_requests_total{method="GET",route="/media/<string:media_id>",status="404"}', text)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/media/<string:media_id>"}', text)
+        self.assertIn('library_persistence_seconds_count{operation="load"}', text)
+        self.assertIn('library_index_seconds_count{operation="rebuild"}', text)
+
+
+class TestProfiling(unittest.TestCase):
+    """Tests du profilage à la demande (jeton d'administration, tampon des derniers profils)."""
+
+    def test_profile_store_keeps_the_latest_profiles(self):
+        """Le tampon ne garde que les N derniers profils; chacun a un rapport texte lisible."""
+        store = profiling.ProfileStore(max_profiles=2)
+        for i in range(3):
+            profiler, start_time = profiling.start()
+            sorted(range(1000), key=lambda value: -value)
+            profiler.disable()
+            store.add('GET', f'/media/{i}', 200, 0.001, profiler)
+        self.assertEqual([profile['path'] for profile in store.list()], ['/media/2', '/media/1'])
+        self.assertIsNone(store.get(1))
+        self.assertIn('function calls', store.get(3).report('tottime'))
+
+    def test_profiled_request_is_stored_and_downloadable(self):
+        """Une requête portant le jeton est profilée; sans jeton valide, les profils restent inaccessibles."""
+        LibraryManager.DATA_FILE, LibraryManager.DATA_DIR = TEST_DATA_FILE, TEST_DATA_DIR
+        try:
+            import backend_server
+            client = backend_server.app.test_client()
+            if not profiling.ENABLED:
+                self.assertEqual(client.get('/admin/profiles').status_code, 404)
+            with patch.multiple(profiling, ENABLED=True, TOKEN='secret'), \
+                    patch.object(backend_server, 'profile_store', profiling.ProfileStore()):
+                if backend_server._start_profiling in backend_server.app.before_request_funcs.get(None, []):
+                    response = client.get('/media?_profile=secret&limit=1')
+                else:
+                    # Les hooks ne sont installés qu'au démarrage avec le jeton: appel direct ici
+                    with backend_server.app.test_request_context('/media?_profile=secret&limit=1'):
+                        backend_server._start_profiling()
+                        response = backend_server._finish_profiling(backend_server.app.full_dispatch_request())
+                profile_id = response.headers['X-Profile-Id']
+
+                self.assertEqual(client.get('/admin/profiles', headers={'X-Profile-Token': 'wrong'}).status_code, 403)
+                admin = {'X-Profile-Token': 'secret'}
+                [summary] = client.get('/admin/profiles', headers=admin).get_json()
+                self.assertEqual((str(summary['id']), summary['path']), (profile_id, '/media?limit=1'))
+                report = client.get(f'/admin/profiles/{profile_id}', headers=admin).get_data(as_text=True)
+                self.assertIn('list_media', report)
+                download = client.get(f'/admin/profiles/{profile_id}?format=pstats', headers=admin)
+                self.assertEqual(download.mimetype, 'application/octet-stream')
+        finally:
+            LibraryManager.DATA_FILE, LibraryManager.DATA_DIR = DATA_FILE, DATA_DIR
+            shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
+
+
+class TestSqliteStorage(unittest.TestCase):
+    """Tests du backend SQLite partagé entre plusieurs instances (simule plusieurs workers)."""
+
+    def setUp(self):
+        self._original_data_file = LibraryManager.DATA_FILE
+        self._original_data_dir = LibraryManager.DATA_DIR
+        LibraryManager.DATA_FILE = TEST_DATA_FILE
+        LibraryManager.DATA_DIR = TEST_DATA_DIR
+        if os.path.exists(TEST_DATA_DIR):
+            shutil.rmtree(TEST_DATA_DIR)
+
+    def tearDown(self):
+        LibraryManager.DATA_FILE = self._original_data_file
+        LibraryManager.DATA_DIR = self._original_data_dir
+        if os.path.exists(TEST_DATA_DIR):
+            shutil.rmtree(TEST_DATA_DIR)
+
+    def test_workers_share_the_same_catalog(self):
+        """Les ajouts et suppressions d'un worker sont vus par l'autre, index compris, sans collision d'ID."""
+        worker_a = LibraryManager(storage_mode='sqlite')
+        worker_b = LibraryManager(storage_mode='sqlite')
+        added_a = worker_a.add_media("Dune", "Frank Herbert", "1965-08-01", "Book")
+        added_b = worker_b.add_media("Arrival", "Denis Villeneuve", "2016-09-01", "Film")
+        self.assertNotEqual(added_a['id'], added_b['id'])
+
+        self.assertEqual(worker_b.search_media_by_name("dune")['id'], added_a['id'])
+        self.assertIn(added_b['id'], [m['id'] for m in worker_a.get_media_by_category("Film")])
+
+        worker_b.delete_media(added_a['id'])
+        self.assertIsNone(worker_a.get_media_by_id(added_a['id']))
+        self.assertEqual(worker_a.get_category_counts(), worker_b.get_category_counts())
+        worker_a.close()
+        worker_b.close()
+
+    def test_migration_imports_json_catalog(self):
+        """L'outil de migration copie le catalogue JSON et fait suivre l'allocation d'IDs."""
+        os.makedirs(TEST_DATA_DIR, exist_ok=True)
+        with open(TEST_DATA_FILE, 'w') as f:
+            json.dump(MOCK_DATA_CONTENT, f)
+        target = os.path.join(TEST_DATA_DIR, 'media_data.sqlite3')
+        self.assertEqual(migrate_to_sqlite.migrate(TEST_DATA_FILE, target), 2)
+        with self.assertRaises(FileExistsError):
+            migrate_to_sqlite.migrate(TEST_DATA_FILE, target)
+
+        manager = LibraryManager(storage_mode='sqlite')
+        self.assertEqual(manager.get_media_by_id("100")['name'], "Test Entry 1 (Book)")
+        self.assertEqual(manager.add_media("New", "X", "2024-01-01", "Book")['id'], "102")
+        manager.close()
+
+
 if __name__ == '__main__':
     unittest.main()
     # STATUT: V1.0 - La suite de tests unitaires et d'intégration est complète.